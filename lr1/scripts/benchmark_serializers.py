@@ -0,0 +1,61 @@
+import gzip # Імпортуємо gzip - той самий кодек, що й у producer-і
+import time # Імпортуємо time для вимірювань
+from power_stations import generate_power_batch # Пакетний генератор даних
+from serializers import SERIALIZERS # Доступні формати серіалізації
+
+# --- КОНФІГУРАЦІЯ ---
+N_MESSAGES = 20000 # Кількість повідомлень для тесту
+KAFKA_BATCH_BYTES = 16384 # batch_size producer-а: стискаємо пакети такого розміру
+
+
+def compressed_size(payloads):
+    """Розмір після gzip, якщо повідомлення йдуть пакетами по KAFKA_BATCH_BYTES"""
+    total = 0
+    chunk = []
+    chunk_bytes = 0
+    for payload in payloads:
+        chunk.append(payload)
+        chunk_bytes += len(payload)
+        if chunk_bytes >= KAFKA_BATCH_BYTES:
+            total += len(gzip.compress(b''.join(chunk)))
+            chunk, chunk_bytes = [], 0
+    if chunk:
+        total += len(gzip.compress(b''.join(chunk)))
+    return total
+
+
+def benchmark(serializer, records):
+    """Вимірюємо розмір та час кодування/декодування одного формату"""
+    start = time.perf_counter()
+    payloads = [serializer.serialize(record) for record in records]
+    encode_us = (time.perf_counter() - start) / len(records) * 1e6
+
+    start = time.perf_counter()
+    for payload in payloads:
+        serializer.deserialize(payload)
+    decode_us = (time.perf_counter() - start) / len(records) * 1e6
+
+    raw_bytes = sum(len(p) for p in payloads) / len(records)
+    gzip_bytes = compressed_size(payloads) / len(records)
+    return raw_bytes, gzip_bytes, encode_us, decode_us
+
+
+def main():
+    records = generate_power_batch(N_MESSAGES)
+    print(f"📊 Порівняння серіалізаторів ({N_MESSAGES:,} повідомлень)")
+    print("=" * 80)
+    print(f"{'Формат':<8} | {'Байт/повід.':>11} | {'gzip байт/повід.':>16} | {'Encode мкс':>10} | {'Decode мкс':>10}")
+    print("-" * 80)
+
+    for name, serializer_cls in SERIALIZERS.items():
+        try:
+            serializer = serializer_cls()
+        except ImportError as e:
+            print(f"{name:<8} | Пропущено: {e}")
+            continue
+        raw_bytes, gzip_bytes, encode_us, decode_us = benchmark(serializer, records)
+        print(f"{name:<8} | {raw_bytes:11.1f} | {gzip_bytes:16.1f} | {encode_us:10.2f} | {decode_us:10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+import time # Імпортуємо time для вимірювання швидкості
+import uuid # Імпортуємо uuid для стабільних ID станцій
+from datetime import datetime # Імпортуємо datetime для часових міток
+from cassandra.cluster import Cluster # Імпортуємо драйвер Cassandra
+from cassandra.concurrent import execute_concurrent # Паралельне виконання запитів
+from kafka.errors import CommitFailedError # Помилка коміту після ребалансу
+from simple_consumer import create_consumer, MAX_POLL_RECORDS, POLL_TIMEOUT_MS # Перевикористовуємо consumer
+
+# --- КОНФІГУРАЦІЯ ---
+CASSANDRA_HOSTS = ['127.0.0.1'] # Адреси вузлів Cassandra
+KEYSPACE = 'lab3_ev_network' # Keyspace зі схемами ЛР3
+GROUP_ID = 'energy-cassandra-sink' # Стабільна група: офсети зберігаються між запусками
+CONCURRENCY = 256 # Максимум паралельних запитів до Cassandra
+MAX_RETRIES = 3 # Повтори для невдалих записів перед відкатом пакета
+REPORT_INTERVAL = 5 # Як часто (с) виводити швидкість
+FAILURE_BACKOFF = 1.0 # Пауза (с) після невдалого пакета, подвоюється з кожною невдачею поспіль
+MAX_FAILURE_BACKOFF = 30.0 # Верхня межа паузи (менше за max.poll.interval.ms consumer-а)
+STATION_NAMESPACE = uuid.UUID('6f1c2f5e-7a43-4b8e-9d59-3f0a3c1b7e21') # Простір імен для uuid5 станцій
+
+
+_station_ids = {} # Кеш: назва станції -> UUID
+
+
+def station_uuid(name):
+    """Стабільний UUID станції з її назви (однаковий для всіх запусків)"""
+    station_id = _station_ids.get(name)
+    if station_id is None:
+        station_id = _station_ids[name] = uuid.uuid5(STATION_NAMESPACE, name)
+    return station_id
+
+
+def to_rows(data):
+    """
+    Повідомлення power-station-data -> параметри для схем ЛР3:
+    (station_id, hour_bucket/day_bucket, event_time, connector_type, power_kw, session_duration)
+    """
+    event_time = datetime.fromisoformat(data['timestamp'])
+    # bucket_hour у форматі YYYYMMDDHH, як у generate_data_hourly.py
+    hour_bucket = ((event_time.year * 100 + event_time.month) * 100 + event_time.day) * 100 + event_time.hour
+    station_id = station_uuid(data['station_name'])
+    power_kw = round(data['power_output_mw'] * 1000, 2) # МВт -> кВт
+    station_type = data.get('station_type', 'unknown') # Пишеться в connector_type (див. коментар у main)
+
+    hourly = (station_id, hour_bucket, event_time, station_type, power_kw, 0) # Телеметрія миттєва
+    daily = (station_id, event_time.date(), event_time, station_type, power_kw, 0)
+    return hourly, daily
+
+
+def write_batch(session, insert_hourly, insert_daily, values):
+    """
+    Пишемо пакет в обидві таблиці з обмеженою паралельністю.
+    Повертаємо True, якщо всі записи успішні (з урахуванням повторів).
+    """
+    statements = []
+    for data in values:
+        hourly, daily = to_rows(data)
+        statements.append((insert_hourly, hourly))
+        statements.append((insert_daily, daily))
+
+    for attempt in range(MAX_RETRIES + 1):
+        results = execute_concurrent(session, statements, concurrency=CONCURRENCY, raise_on_first_error=False)
+        # Вставки ідемпотентні (той самий primary key), тому повторюємо лише невдалі
+        failed = [statement for statement, (success, _) in zip(statements, results) if not success]
+        if not failed:
+            return True
+        print(f"⚠️ Невдалих записів: {len(failed)} (спроба {attempt + 1}/{MAX_RETRIES + 1})")
+        statements = failed
+        time.sleep(0.5 * (attempt + 1)) # Даємо кластеру відновитися
+    return False
+
+
+def rewind(consumer, polled):
+    """Повертаємо позиції партицій на початок пакета, щоб прочитати його знову"""
+    for tp, records in polled.items():
+        if records:
+            consumer.seek(tp, records[0].offset)
+
+
+def main():
+    """Kafka power-station-data -> Cassandra (charging_events_hourly, charging_sessions_daily)"""
+    consumer = create_consumer(group_id=GROUP_ID, enable_auto_commit=False)
+    if not consumer:
+        return
+
+    cluster = Cluster(CASSANDRA_HOSTS)
+    session = cluster.connect(KEYSPACE)
+    print(f"✅ Підключено до Cassandra (keyspace '{KEYSPACE}')")
+
+    # Схеми ЛР3 описують зарядні станції, а power-station-data - електростанції без конекторів:
+    # колонка connector_type у цих таблицях містить тип електростанції (station_type)
+    insert_hourly = session.prepare("""
+        INSERT INTO charging_events_hourly
+        (station_id, hour_bucket, event_time, connector_type, power_kw, session_duration)
+        VALUES (?, ?, ?, ?, ?, ?)
+    """)
+    insert_daily = session.prepare("""
+        INSERT INTO charging_sessions_daily
+        (station_id, day_bucket, event_time, connector_type, power_kw, session_duration)
+        VALUES (?, ?, ?, ?, ?, ?)
+    """)
+
+    print("👀 Очікуємо дані від електростанцій...")
+    print("🛑 Натисніть Ctrl+C для зупинки\n")
+
+    total = 0 # Всього збережено повідомлень
+    written = 0 # Збережено з моменту останнього звіту
+    last_report = time.perf_counter()
+    failures = 0 # Невдалих пакетів поспіль
+
+    try:
+        while True:
+            polled = consumer.poll(timeout_ms=POLL_TIMEOUT_MS, max_records=MAX_POLL_RECORDS)
+            values = [record.value for records in polled.values() for record in records]
+
+            if values:
+                if write_batch(session, insert_hourly, insert_daily, values):
+                    failures = 0
+                    total += len(values)
+                    written += len(values)
+                    try:
+                        consumer.commit() # Офсети комітимо лише після успішного запису
+                    except CommitFailedError as e:
+                        # Партиції вже в іншого consumer-а - він прочитає пакет знову, а вставки ідемпотентні
+                        print(f"⚠️ Коміт відхилено після ребалансу: {e}")
+                else:
+                    failures += 1
+                    backoff = min(FAILURE_BACKOFF * 2 ** (failures - 1), MAX_FAILURE_BACKOFF)
+                    print(f"❌ Пакет не записано - повертаємось до його початку через {backoff:.0f} с")
+                    rewind(consumer, polled)
+                    time.sleep(backoff) # Не крутимо порожній цикл, поки Cassandra недоступна
+
+            now = time.perf_counter()
+            if now - last_report >= REPORT_INTERVAL:
+                rate = written / (now - last_report)
+                print(f"💾 {rate:,.0f} повідомлень/сек ({rate * 2:,.0f} рядків/сек) | Всього: {total}")
+                written, last_report = 0, now
+
+    except KeyboardInterrupt:
+        print(f"\n🛑 Sink зупинено. Збережено {total} повідомлень")
+
+    finally:
+        consumer.close()
+        cluster.shutdown()
+        print("🔌 З'єднання закрито")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+import time # Імпортуємо time для вимірювання швидкості
+import queue # Імпортуємо queue для обробки тайм-аутів черги звітів
+import multiprocessing as mp # Імпортуємо multiprocessing для процесів-воркерів
+from kafka import ConsumerRebalanceListener # Імпортуємо listener для ребалансу
+from kafka.errors import CommitFailedError # Помилка коміту після ребалансу
+from station_state import StationStateStore # Ковзна статистика по станціях
+from simple_consumer import (
+    create_consumer, records_to_columns, analyze_power_batch, update_station_state,
+    MAX_POLL_RECORDS, POLL_TIMEOUT_MS
+) # Перевикористовуємо consumer та пакетний аналіз
+
+# --- КОНФІГУРАЦІЯ ---
+GROUP_ID = 'energy-monitor-group' # Стабільна група: воркери ділять партиції між собою
+NUM_WORKERS = 4 # Кількість процесів (має бути <= кількості партицій топіку)
+REPORT_INTERVAL = 5 # Як часто (с) воркери звітують про швидкість та lag
+
+
+class CommitOnRevoke(ConsumerRebalanceListener):
+    """Комітимо оброблені офсети перед тим, як партиції заберуть в іншого воркера"""
+
+    def __init__(self, worker_id):
+        self.worker_id = worker_id
+        self.consumer = None # Встановлюється після створення consumer-а
+
+    def on_partitions_revoked(self, revoked):
+        if self.consumer is not None and revoked:
+            try:
+                self.consumer.commit() # Всі повернуті poll() записи вже оброблені
+            except CommitFailedError as e:
+                print(f"⚠️ [worker {self.worker_id}] Не вдалося закомітити при ребалансі: {e}")
+        print(f"🔄 [worker {self.worker_id}] Відкликано партиції: {sorted(tp.partition for tp in revoked)}")
+
+    def on_partitions_assigned(self, assigned):
+        print(f"🔄 [worker {self.worker_id}] Призначено партиції: {sorted(tp.partition for tp in assigned)}")
+
+
+def partition_lag(consumer):
+    """Сумарний lag по призначених партиціях: end offset - поточна позиція"""
+    assigned = consumer.assignment()
+    if not assigned:
+        return 0
+    end_offsets = consumer.end_offsets(list(assigned))
+    return sum(max(0, end_offsets[tp] - consumer.position(tp)) for tp in assigned)
+
+
+def run_worker(worker_id, reports, stop_event):
+    """Воркер: poll() -> пакетний аналіз -> коміт офсетів після обробки"""
+    listener = CommitOnRevoke(worker_id)
+    consumer = create_consumer(group_id=GROUP_ID, enable_auto_commit=False, listener=listener)
+    if not consumer:
+        return
+    listener.consumer = consumer
+
+    processed = 0 # Оброблено з моменту останнього звіту
+    warnings = 0 # Записів з критичною частотою з моменту останнього звіту
+    alerts = 0 # Відхилень від базової лінії станцій з моменту останнього звіту
+    state_store = StationStateStore() # Стан лише по станціях, що прийшли в партиції воркера
+    total = 0 # Всього оброблено воркером
+    last_report = time.perf_counter()
+
+    try:
+        while not stop_event.is_set():
+            polled = consumer.poll(timeout_ms=POLL_TIMEOUT_MS, max_records=MAX_POLL_RECORDS)
+            values = [record.value for records in polled.values() for record in records]
+
+            if values:
+                analysis = analyze_power_batch(records_to_columns(values))
+                warnings += int(analysis['critical_frequency'].sum())
+                alerts += len(update_station_state(state_store, values))
+                processed += len(values)
+                total += len(values)
+                try:
+                    consumer.commit() # Комітимо тільки після обробки пакета
+                except CommitFailedError as e:
+                    # Партиції вже в іншого воркера - пакет буде оброблено повторно (at-least-once)
+                    print(f"⚠️ [worker {worker_id}] Коміт відхилено після ребалансу: {e}")
+
+            now = time.perf_counter()
+            if now - last_report >= REPORT_INTERVAL:
+                reports.put({
+                    'worker_id': worker_id,
+                    'partitions': sorted(tp.partition for tp in consumer.assignment()),
+                    'rate': processed / (now - last_report),
+                    'lag': partition_lag(consumer),
+                    'warnings': warnings,
+                    'alerts': alerts,
+                    'total': total,
+                })
+                processed, warnings, alerts, last_report = 0, 0, 0, now
+
+    except KeyboardInterrupt:
+        pass # Зупинку координує головний процес
+
+    finally:
+        consumer.close() # close() залишає групу, інші воркери отримують партиції
+        print(f"🔌 [worker {worker_id}] Зупинено. Оброблено {total} повідомлень")
+
+
+def print_reports(latest):
+    """Таблиця швидкості та lag по воркерах"""
+    print(f"\n📊 {'Worker':<7} | {'Партиції':<14} | {'Записів/сек':>11} | {'Lag':>8} | {'🚨 Частота':>10} | {'📉 Базова':>9} | {'Всього':>9}")
+    print("-" * 87)
+    for worker_id in sorted(latest):
+        r = latest[worker_id]
+        partitions = ','.join(str(p) for p in r['partitions']) or '-'
+        print(f"   {worker_id:<7} | {partitions:<14} | {r['rate']:11,.0f} | {r['lag']:8} | {r['warnings']:10} | {r['alerts']:9} | {r['total']:9}")
+    total_rate = sum(r['rate'] for r in latest.values())
+    total_lag = sum(r['lag'] for r in latest.values())
+    print(f"   {'Разом':<7} | {'':<14} | {total_rate:11,.0f} | {total_lag:8} |")
+
+
+def main():
+    """Запускаємо NUM_WORKERS процесів в одній групі споживачів"""
+    print(f"🚀 Запуск {NUM_WORKERS} воркерів у групі '{GROUP_ID}'")
+    print("🛑 Натисніть Ctrl+C для зупинки\n")
+
+    reports = mp.Queue()
+    stop_event = mp.Event()
+    workers = [
+        mp.Process(target=run_worker, args=(worker_id, reports, stop_event), name=f"worker-{worker_id}")
+        for worker_id in range(NUM_WORKERS)
+    ]
+    for worker in workers:
+        worker.start()
+
+    latest = {} # Останній звіт кожного воркера
+    last_print = time.perf_counter()
+
+    try:
+        while any(worker.is_alive() for worker in workers):
+            try:
+                report = reports.get(timeout=1)
+                latest[report['worker_id']] = report
+            except queue.Empty:
+                pass
+
+            if latest and time.perf_counter() - last_print >= REPORT_INTERVAL:
+                print_reports(latest)
+                last_print = time.perf_counter()
+
+    except KeyboardInterrupt:
+        print("\n🛑 Зупиняємо воркерів...")
+
+    finally:
+        stop_event.set()
+        for worker in workers:
+            worker.join(timeout=30)
+        print("🔌 Всі воркери зупинені")
+
+
+if __name__ == "__main__":
+    main()
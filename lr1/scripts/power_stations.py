@@ -0,0 +1,134 @@
+import time # Імпортуємо time для бенчмарку
+from datetime import datetime # Імпортуємо datetime для часових міток
+import numpy as np # Імпортуємо NumPy для векторизованої генерації
+
+# --- КОНФІГУРАЦІЯ ---
+FLEET_SIZE = 4 # Кількість станцій у парку (4 = базові станції)
+KAFKA_VERSION = "3.7.1" # Версія Kafka, яку додаємо в кожен запис
+
+STATIONS = [
+    {"name": "Київська ТЕС", "type": "thermal", "max_power": 1200},
+    {"name": "Дніпровська ГЕС", "type": "hydro", "max_power": 800},
+    {"name": "Сонячна ферма", "type": "solar", "max_power": 150},
+    {"name": "Вітряна ферма", "type": "wind", "max_power": 200}
+] # Базові типи станцій
+
+
+def build_station_fleet(size=FLEET_SIZE):
+    """Будуємо парк станцій заданого розміру на основі базових станцій"""
+    fleet = []
+    for i in range(size):
+        base = STATIONS[i % len(STATIONS)] # Чергуємо типи станцій
+        number = i // len(STATIONS) + 1 # Порядковий номер станції цього типу
+        name = base["name"] if number == 1 else f"{base['name']} №{number}"
+        fleet.append({"name": name, "type": base["type"], "max_power": base["max_power"]})
+    return fleet
+
+
+STATION_FLEET = build_station_fleet() # Парк, спільний для producer-а та consumer-а
+
+
+class FleetArrays:
+    """Колонкове представлення парку станцій для векторизованої генерації"""
+
+    def __init__(self, fleet):
+        self.names = np.array([s["name"] for s in fleet], dtype=object)
+        self.types = np.array([s["type"] for s in fleet], dtype=object)
+        self.max_power = np.array([s["max_power"] for s in fleet], dtype=np.float64)
+        self.is_solar = self.types == "solar"
+        self.is_wind = self.types == "wind"
+
+
+def generate_power_columns(n, fleet_arrays, rng, hour=None):
+    """
+    Генеруємо N записів одразу у вигляді колонок NumPy.
+    Правила ті ж, що й у generate_power_data():
+    - Сонячні: вдень (6-18) 0.7-0.95, вночі 0.0-0.1
+    - Вітряні: вітер < 3 м/с - 0, > 12 м/с - 0.8-1.0, інакше (v/12)^2
+    - ТЕС та ГЕС: 0.75-0.95
+    """
+    if hour is None:
+        hour = datetime.now().hour # Поточна година
+
+    idx = rng.integers(0, len(fleet_arrays.names), size=n) # Випадкові станції
+
+    # ТЕС та ГЕС - більш стабільні (базове значення для всіх)
+    power_factor = rng.uniform(0.75, 0.95, size=n)
+
+    # Сонячні панелі залежать від часу доби
+    solar = fleet_arrays.is_solar[idx]
+    if 6 <= hour <= 18:
+        solar_factor = rng.uniform(0.7, 0.95, size=n) # Вдень
+    else:
+        solar_factor = rng.uniform(0.0, 0.1, size=n) # Вночі
+    power_factor = np.where(solar, solar_factor, power_factor)
+
+    # Вітряки залежать від швидкості вітру
+    wind = fleet_arrays.is_wind[idx]
+    wind_speed = rng.uniform(0, 15, size=n) # м/с
+    wind_factor = np.where(
+        wind_speed < 3, 0.0, # Слабкий вітер
+        np.where(wind_speed > 12, rng.uniform(0.8, 1.0, size=n), (wind_speed / 12) ** 2)
+    )
+    power_factor = np.where(wind, wind_factor, power_factor)
+
+    return {
+        "station_index": idx,
+        "power_output_mw": np.round(fleet_arrays.max_power[idx] * power_factor, 2),
+        "voltage_kv": np.round(rng.uniform(218, 222, size=n), 1),
+        "frequency_hz": np.round(rng.uniform(49.9, 50.1, size=n), 2),
+        "efficiency_percent": np.round(rng.uniform(82, 88, size=n), 1),
+    }
+
+
+def generate_power_batch(n, fleet=None, rng=None):
+    """Генеруємо N записів у форматі generate_power_data() за один прохід"""
+    fleet_arrays = fleet if isinstance(fleet, FleetArrays) else FleetArrays(fleet or STATION_FLEET)
+    rng = rng or np.random.default_rng()
+
+    columns = generate_power_columns(n, fleet_arrays, rng)
+    idx = columns["station_index"]
+    timestamp = datetime.now().isoformat() # Одна часова мітка на пакет
+
+    # tolist() переводить колонки у звичайні Python типи одним викликом
+    return [
+        {
+            "station_name": name,
+            "station_type": station_type,
+            "timestamp": timestamp,
+            "power_output_mw": power,
+            "voltage_kv": voltage,
+            "frequency_hz": frequency,
+            "efficiency_percent": efficiency,
+            "kafka_version": KAFKA_VERSION
+        }
+        for name, station_type, power, voltage, frequency, efficiency in zip(
+            fleet_arrays.names[idx].tolist(),
+            fleet_arrays.types[idx].tolist(),
+            columns["power_output_mw"].tolist(),
+            columns["voltage_kv"].tolist(),
+            columns["frequency_hz"].tolist(),
+            columns["efficiency_percent"].tolist(),
+        )
+    ]
+
+
+def main():
+    """Мікробенчмарк швидкості генерації"""
+    batch_size = 100_000
+    rounds = 10
+    fleet_arrays = FleetArrays(build_station_fleet(1000))
+    rng = np.random.default_rng()
+
+    start = time.perf_counter()
+    for _ in range(rounds):
+        generate_power_batch(batch_size, fleet_arrays, rng)
+    duration = time.perf_counter() - start
+
+    total = batch_size * rounds
+    print(f"⚡ Згенеровано {total:,} записів за {duration:.2f} с "
+          f"({total / duration:,.0f} записів/сек)")
+
+
+if __name__ == "__main__":
+    main()
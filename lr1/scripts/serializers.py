@@ -0,0 +1,190 @@
+import io # Імпортуємо io для буферів Avro
+import json # Імпортуємо JSON для базового формату
+import struct # Імпортуємо struct для компактного бінарного формату
+from datetime import datetime, timedelta # Імпортуємо datetime для часових міток
+from power_stations import STATION_FLEET, KAFKA_VERSION # Спільний парк станцій
+
+# --- КОНФІГУРАЦІЯ ---
+SERIALIZER_FORMAT = 'json' # 'json', 'struct' або 'avro' - однаково для producer-а та consumer-а
+
+STATION_TYPES = ["thermal", "hydro", "solar", "wind"] # Словник типів станцій
+UNKNOWN_CODE = 0xFFFF # Код станції, якої немає у словнику (назва передається явно)
+UNKNOWN_TYPE = 0xFF # Код невідомого типу станції
+EPOCH = datetime(1970, 1, 1) # Точка відліку для часових міток
+
+
+class StationDictionary:
+    """Словник назв станцій: довгі назви передаються як 2-байтний код"""
+
+    def __init__(self, names):
+        self.names = list(names)
+        self.codes = {name: code for code, name in enumerate(self.names)}
+        if len(self.names) >= UNKNOWN_CODE:
+            raise ValueError(f"Словник підтримує до {UNKNOWN_CODE - 1} станцій")
+
+    def encode(self, name):
+        return self.codes.get(name, UNKNOWN_CODE)
+
+    def decode(self, code):
+        return self.names[code]
+
+
+def timestamp_to_micros(timestamp):
+    """ISO рядок -> мікросекунди від EPOCH"""
+    return (datetime.fromisoformat(timestamp) - EPOCH) // timedelta(microseconds=1)
+
+
+def micros_to_timestamp(micros):
+    """Мікросекунди від EPOCH -> ISO рядок"""
+    return (EPOCH + timedelta(microseconds=micros)).isoformat()
+
+
+class JsonSerializer:
+    """Поточний формат: JSON у UTF-8"""
+
+    name = 'json'
+
+    def serialize(self, data):
+        return json.dumps(data, ensure_ascii=False).encode('utf-8')
+
+    def deserialize(self, payload):
+        return json.loads(payload.decode('utf-8'))
+
+
+class StructSerializer:
+    """
+    Фіксований бінарний формат (22 байти + назва, якщо станції немає у словнику):
+    версія, код станції, тип, час (мкс), потужність (x100), напруга (x10), частота (x100), ККД (x10)
+    """
+
+    name = 'struct'
+    VERSION = 1
+    HEADER = struct.Struct('<BHBqIHHH') # Фіксована частина запису
+    NAME_LEN = struct.Struct('<H') # Довжина явної назви станції
+
+    def __init__(self, stations=None):
+        self.stations = stations or StationDictionary(s["name"] for s in STATION_FLEET)
+        self.type_codes = {t: i for i, t in enumerate(STATION_TYPES)}
+
+    def serialize(self, data):
+        name = data["station_name"]
+        code = self.stations.encode(name)
+        payload = self.HEADER.pack(
+            self.VERSION,
+            code,
+            self.type_codes.get(data["station_type"], UNKNOWN_TYPE),
+            timestamp_to_micros(data["timestamp"]),
+            int(round(data["power_output_mw"] * 100)),
+            int(round(data["voltage_kv"] * 10)),
+            int(round(data["frequency_hz"] * 100)),
+            int(round(data["efficiency_percent"] * 10))
+        )
+        if code == UNKNOWN_CODE:
+            raw_name = name.encode('utf-8')
+            payload += self.NAME_LEN.pack(len(raw_name)) + raw_name
+        return payload
+
+    def deserialize(self, payload):
+        version, code, type_code, micros, power, voltage, frequency, efficiency = \
+            self.HEADER.unpack_from(payload)
+        if version != self.VERSION:
+            raise ValueError(f"Невідома версія формату: {version}")
+
+        if code == UNKNOWN_CODE:
+            (name_len,) = self.NAME_LEN.unpack_from(payload, self.HEADER.size)
+            start = self.HEADER.size + self.NAME_LEN.size
+            name = payload[start:start + name_len].decode('utf-8')
+        else:
+            name = self.stations.decode(code)
+
+        return {
+            "station_name": name,
+            "station_type": STATION_TYPES[type_code] if type_code < len(STATION_TYPES) else "unknown",
+            "timestamp": micros_to_timestamp(micros),
+            "power_output_mw": power / 100,
+            "voltage_kv": voltage / 10,
+            "frequency_hz": frequency / 100,
+            "efficiency_percent": efficiency / 10,
+            "kafka_version": KAFKA_VERSION # Константа не передається по мережі
+        }
+
+
+AVRO_SCHEMA = {
+    "type": "record",
+    "name": "PowerStationData",
+    "namespace": "lr1.energy",
+    "fields": [
+        {"name": "station_code", "type": "int"},
+        {"name": "station_name", "type": ["null", "string"], "default": None},
+        {"name": "station_type", "type": {"type": "enum", "name": "StationType",
+                                          "symbols": STATION_TYPES + ["unknown"]}},
+        {"name": "timestamp_micros", "type": "long"},
+        {"name": "power_centi_mw", "type": "long"},
+        {"name": "voltage_deci_kv", "type": "int"},
+        {"name": "frequency_centi_hz", "type": "int"},
+        {"name": "efficiency_deci_percent", "type": "int"}
+    ]
+}
+
+
+class AvroSerializer:
+    """Avro (schemaless binary) зі словником станцій та масштабованими цілими"""
+
+    name = 'avro'
+
+    def __init__(self, stations=None):
+        import avro.io # Імпортуємо тут, щоб JSON/struct не залежали від avro
+        import avro.schema
+
+        self.avro_io = avro.io
+        self.stations = stations or StationDictionary(s["name"] for s in STATION_FLEET)
+        self.schema = avro.schema.parse(json.dumps(AVRO_SCHEMA))
+        self.writer = avro.io.DatumWriter(self.schema)
+        self.reader = avro.io.DatumReader(self.schema)
+
+    def serialize(self, data):
+        name = data["station_name"]
+        code = self.stations.encode(name)
+        station_type = data["station_type"]
+        record = {
+            "station_code": code,
+            "station_name": name if code == UNKNOWN_CODE else None,
+            "station_type": station_type if station_type in STATION_TYPES else "unknown",
+            "timestamp_micros": timestamp_to_micros(data["timestamp"]),
+            "power_centi_mw": int(round(data["power_output_mw"] * 100)),
+            "voltage_deci_kv": int(round(data["voltage_kv"] * 10)),
+            "frequency_centi_hz": int(round(data["frequency_hz"] * 100)),
+            "efficiency_deci_percent": int(round(data["efficiency_percent"] * 10))
+        }
+        buffer = io.BytesIO()
+        self.writer.write(record, self.avro_io.BinaryEncoder(buffer))
+        return buffer.getvalue()
+
+    def deserialize(self, payload):
+        record = self.reader.read(self.avro_io.BinaryDecoder(io.BytesIO(payload)))
+        code = record["station_code"]
+        return {
+            "station_name": record["station_name"] if code == UNKNOWN_CODE else self.stations.decode(code),
+            "station_type": record["station_type"],
+            "timestamp": micros_to_timestamp(record["timestamp_micros"]),
+            "power_output_mw": record["power_centi_mw"] / 100,
+            "voltage_kv": record["voltage_deci_kv"] / 10,
+            "frequency_hz": record["frequency_centi_hz"] / 100,
+            "efficiency_percent": record["efficiency_deci_percent"] / 10,
+            "kafka_version": KAFKA_VERSION
+        }
+
+
+SERIALIZERS = {
+    'json': JsonSerializer,
+    'struct': StructSerializer,
+    'avro': AvroSerializer
+}
+
+
+def get_serializer(name=SERIALIZER_FORMAT):
+    """Повертаємо серіалізатор за назвою формату"""
+    try:
+        return SERIALIZERS[name]()
+    except KeyError:
+        raise ValueError(f"Невідомий формат серіалізації: {name}") from None
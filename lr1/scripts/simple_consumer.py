@@ -1,31 +1,46 @@
 from kafka import KafkaConsumer # Імпортуємо KafkaConsumer
-import json # Імпортуємо JSON для десеріалізації
 from datetime import datetime # Імпортуємо datetime для часових міток
 import time # Імпортуємо time для унікальної групи
+import numpy as np # Імпортуємо NumPy для колонкового аналізу пакетів
+from serializers import get_serializer # Спільний шар серіалізації
+from station_state import StationStateStore, format_alert # Ковзна статистика по станціях
+
+# --- КОНФІГУРАЦІЯ ---
+TOPIC = 'power-station-data' # Topic який читаємо
+CONSUMER_MODE = 'stream' # 'stream' - вивід по кожному повідомленню, 'batch' - пакетний аналіз через poll()
+MAX_POLL_RECORDS = 500 # Максимум повідомлень за один poll()
+POLL_TIMEOUT_MS = 1000 # Скільки чекаємо на дані в poll()
+
+# Статуси для пакетного аналізу (ті ж, що й в analyze_power_data)
+POWER_STATUSES = ["🔴 ВІДКЛЮЧЕНА", "🟡 НИЗЬКА ПОТУЖНІСТЬ", "🟢 ВИСОКА ПОТУЖНІСТЬ", "🟢 НОРМАЛЬНА ПОТУЖНІСТЬ"]
+VOLTAGE_STATUSES = ["🟢 НОРМА", "🟠 ВІДХИЛЕННЯ"]
+FREQUENCY_STATUSES = ["🟢 НОРМА", "🔴 КРИТИЧНО"]
+EFFICIENCY_STATUSES = ["🟢 ВІДМІННО", "🟡 ДОБРЕ", "🟠 ПОГАНО"]
 
  
-def create_consumer():
+def create_consumer(group_id=None, enable_auto_commit=True, listener=None):
     """Створюємо Kafka consumer з налаштуваннями"""
     print("🔌 Підключаємся до Kafka як Consumer...")
     
     try:
         consumer = KafkaConsumer(
-            'power-station-data',  # Topic який читаємо
             bootstrap_servers=['localhost:9092'],  # Адреса Kafka брокера
             auto_offset_reset='latest',  # Починаємо з останніх повідомлень
-            group_id=f'energy-monitor-{int(time.time())}',#'energy-monitor-group',  # Група consumers
-            # Перетворюємо JSON назад в Python об'єкти
-            value_deserializer=lambda m: json.loads(m.decode('utf-8')), # UTF-8 декодування
+            # Без group_id кожен запуск - окрема група (як і раніше)
+            group_id=group_id or f'energy-monitor-{int(time.time())}',
+            # Перетворюємо повідомлення назад в Python об'єкти (той самий формат, що й у producer-а)
+            value_deserializer=get_serializer().deserialize,
             # Налаштування для надійності
-            enable_auto_commit=True, # Автоматичний коміт збережених офсетів
+            enable_auto_commit=enable_auto_commit, # Автоматичний коміт збережених офсетів
             auto_commit_interval_ms=5000, # Комітимо кожні 5 секунд
             session_timeout_ms=30000, # 30 секунд
             heartbeat_interval_ms=10000, # 10 секунд
-            max_poll_records=500, # Максимум 500 повідомлень за раз
+            max_poll_records=MAX_POLL_RECORDS, # Максимум повідомлень за раз
             # Налаштування для продуктивності
             fetch_min_bytes=1024, # Мінімум 1KB для отримання
             fetch_max_wait_ms=1000 # Чекаємо до 1 секунди для збору даних
         )
+        consumer.subscribe([TOPIC], listener=listener) # Topic який читаємо
         
         print("✅ Consumer для Kafka готовий до роботи!")
         return consumer # Повертаємо створений consumer
@@ -89,7 +104,7 @@ def analyze_power_data(data):
         return None
 
  
-def process_power_data(data):
+def process_power_data(data, state_store=None):
     """Обробляємо отримані дані"""
     try:
         station = data.get('station_name', 'Невідома станція') # Назва станції
@@ -125,6 +140,11 @@ def process_power_data(data):
         if efficiency < 75:
             warnings.append("⚠️ Низький ККД - потрібне технічне обслуговування")
         
+        # Відхилення від власної базової лінії станції
+        if state_store is not None:
+            for alert in state_store.update(station, data):
+                warnings.append(format_alert(station, alert))
+        
         if warnings:
             print("\n🚨 ПОПЕРЕДЖЕННЯ:")
             for warning in warnings:
@@ -142,6 +162,121 @@ def process_power_data(data):
         print(f"❌ Помилка обробки: {e}")
         print(f"📝 Сирі дані: {data}")
 
+
+def records_to_columns(values):
+    """Перекладаємо пакет словників у колонки NumPy (один прохід по полях)"""
+    return {
+        'station_name': [v.get('station_name', 'Невідома станція') for v in values],
+        'station_type': [v.get('station_type', 'unknown') for v in values],
+        'power': np.fromiter((v.get('power_output_mw', 0) for v in values), dtype=np.float64, count=len(values)),
+        'voltage': np.fromiter((v.get('voltage_kv', 0) for v in values), dtype=np.float64, count=len(values)),
+        'frequency': np.fromiter((v.get('frequency_hz', 0) for v in values), dtype=np.float64, count=len(values)),
+        'efficiency': np.fromiter((v.get('efficiency_percent', 0) for v in values), dtype=np.float64, count=len(values)),
+    }
+
+
+def analyze_power_batch(columns):
+    """Векторизовано класифікуємо весь пакет за тими ж порогами, що й analyze_power_data"""
+    power = columns['power']
+    voltage = columns['voltage']
+    frequency = columns['frequency']
+    efficiency = columns['efficiency']
+
+    # Індекси статусів у відповідних списках *_STATUSES
+    power_status = np.select([power == 0, power < 100, power > 1000], [0, 1, 2], default=3)
+    voltage_status = np.where((voltage >= 219) & (voltage <= 221), 0, 1)
+    frequency_status = np.where((frequency >= 49.9) & (frequency <= 50.1), 0, 1)
+    efficiency_status = np.select([efficiency >= 85, efficiency >= 80], [0, 1], default=2)
+
+    return {
+        'power': np.bincount(power_status, minlength=len(POWER_STATUSES)),
+        'voltage': np.bincount(voltage_status, minlength=len(VOLTAGE_STATUSES)),
+        'frequency': np.bincount(frequency_status, minlength=len(FREQUENCY_STATUSES)),
+        'efficiency': np.bincount(efficiency_status, minlength=len(EFFICIENCY_STATUSES)),
+        # Попередження (ті ж межі, що й у process_power_data)
+        'low_power': power < 50,
+        'bad_voltage': (voltage < 218) | (voltage > 222),
+        'critical_frequency': (frequency < 49.8) | (frequency > 50.2),
+        'low_efficiency': efficiency < 75,
+    }
+
+
+def format_counts(counts, statuses):
+    """'🟢 НОРМА: 480, 🟠 ВІДХИЛЕННЯ: 20' без нульових статусів"""
+    return ", ".join(f"{status}: {count}" for status, count in zip(statuses, counts.tolist()) if count)
+
+
+def update_station_state(state_store, values):
+    """Оновлюємо ковзну статистику станцій записами пакета, повертаємо тривоги"""
+    alerts = []
+    for data in values:
+        station = data.get('station_name', 'Невідома станція')
+        for alert in state_store.update(station, data):
+            alerts.append((station, alert))
+    return alerts
+
+
+def print_batch_summary(batch_number, columns, analysis, elapsed, alerts=()):
+    """Компактний підсумок пакета замість ~10 рядків на запис"""
+    power = columns['power']
+    count = len(power)
+    rate = count / elapsed if elapsed > 0 else 0.0
+
+    print(f"\n📦 Пакет #{batch_number}: {count} записів ({rate:,.0f} записів/сек)")
+    print(f"⚡ Потужність: сума {power.sum():.1f} МВт, середня {power.mean():.1f} МВт | "
+          f"{format_counts(analysis['power'], POWER_STATUSES)}")
+    print(f"🔌 Напруга: {format_counts(analysis['voltage'], VOLTAGE_STATUSES)} | "
+          f"📊 Частота: {format_counts(analysis['frequency'], FREQUENCY_STATUSES)}")
+    print(f"⚙️ ККД: середній {columns['efficiency'].mean():.1f}% | "
+          f"{format_counts(analysis['efficiency'], EFFICIENCY_STATUSES)}")
+
+    warnings = [
+        ("⚠️ Критично низька потужність", analysis['low_power']),
+        ("⚠️ Напруга поза допустимими межами", analysis['bad_voltage']),
+        ("🚨 КРИТИЧНО: Частота поза межами", analysis['critical_frequency']),
+        ("⚠️ Низький ККД", analysis['low_efficiency']),
+    ]
+    for text, mask in warnings:
+        hits = np.flatnonzero(mask)
+        if hits.size:
+            stations = sorted({columns['station_name'][i] for i in hits.tolist()})
+            print(f"   {text}: {hits.size} записів ({', '.join(stations[:5])}{', ...' if len(stations) > 5 else ''})")
+
+    if alerts:
+        print(f"   📉 Відхилення від базової лінії станцій: {len(alerts)}")
+        for station, alert in alerts[:5]:
+            print(f"      {format_alert(station, alert)}")
+
+
+def run_batch_mode(consumer):
+    """Пакетний режим: poll() до MAX_POLL_RECORDS записів та аналіз колонками"""
+    print(f"📦 Пакетний режим: до {MAX_POLL_RECORDS} записів за poll()")
+    message_count = 0 # Лічильник повідомлень
+    batch_number = 0 # Лічильник пакетів
+    state_store = StationStateStore() # Ковзні вікна по станціях
+
+    try:
+        while True:
+            start = time.perf_counter()
+            polled = consumer.poll(timeout_ms=POLL_TIMEOUT_MS, max_records=MAX_POLL_RECORDS)
+            values = [record.value for records in polled.values() for record in records]
+            if not values:
+                continue # Нових даних немає
+
+            columns = records_to_columns(values)
+            analysis = analyze_power_batch(columns)
+            alerts = update_station_state(state_store, values)
+            batch_number += 1
+            message_count += len(values)
+            print_batch_summary(batch_number, columns, analysis, time.perf_counter() - start, alerts)
+
+    except KeyboardInterrupt:
+        print(f"\n🛑 Consumer зупинено. Оброблено {message_count} повідомлень у {batch_number} пакетах")
+
+    finally:
+        consumer.close() # Важливо! Закриваємо consumer коректно
+        print("🔌 З'єднання закрито")
+
  
 def main():
     """Основна функція"""
@@ -149,10 +284,15 @@ def main():
     if not consumer:
         return # Якщо не вдалося підключитися, виходимо
     
+    if CONSUMER_MODE == 'batch':
+        run_batch_mode(consumer)
+        return
+
     print("👀 Очікуємо дані від електростанцій...")
     print("🛑 Натисніть Ctrl+C для зупинки\n")
     
     message_count = 0 # Лічильник повідомлень
+    state_store = StationStateStore() # Ковзні вікна по станціях
     
     try:
         for message in consumer: # Ітеруємося по повідомленнях
@@ -162,7 +302,7 @@ def main():
             print(f"📍 Topic: {message.topic}, Partition: {message.partition}, Offset: {message.offset}")
             
             # Обробляємо отримані дані
-            process_power_data(message.value)
+            process_power_data(message.value, state_store)
             
     except KeyboardInterrupt:
         print(f"\n🛑 Consumer зупинено. Оброблено {message_count} повідомлень")
@@ -1,8 +1,17 @@
 from kafka import KafkaProducer # Імпортуємо KafkaProducer
-import json # Імпортуємо JSON для серіалізації
 import time # Імпортуємо time для затримок
 import random # Імпортуємо random для генерації випадкових даних
+import threading # Імпортуємо threading для вікна in-flight повідомлень
 from datetime import datetime # Імпортуємо datetime для часових міток
+from serializers import get_serializer # Спільний шар серіалізації
+from power_stations import STATION_FLEET, KAFKA_VERSION, FleetArrays, generate_power_batch # Парк станцій та пакетний генератор
+
+# --- КОНФІГУРАЦІЯ ---
+TOPIC = 'power-station-data' # Topic для відправки
+SEND_MODE = 'sync' # 'sync' - одне повідомлення кожні 3 с, 'pipelined' - режим пропускної здатності
+MAX_IN_FLIGHT = 1000 # Максимум непідтверджених повідомлень у pipelined режимі
+REPORT_INTERVAL = 5 # Як часто (с) виводити статистику підтверджень
+GENERATOR_BATCH = 10000 # Скільки записів генеруємо за один виклик у pipelined режимі
 
  
 def create_producer():
@@ -12,7 +21,7 @@ def create_producer():
     try:
         producer = KafkaProducer(
             bootstrap_servers=['localhost:9092'], # Адреса Kafka брокера
-            value_serializer=lambda v: json.dumps(v, ensure_ascii=False).encode('utf-8'), # UTF-8 кодування
+            value_serializer=get_serializer().serialize, # Формат задається SERIALIZER_FORMAT
             acks='all',  # Чекаємо підтвердження від всіх реплік
             retries=3,   # Повторюємо спробу 3 рази при невдачі
             request_timeout_ms=30000, # Час очікування відповіді від брокера
@@ -35,14 +44,7 @@ def create_producer():
  
 def generate_power_data():
     """Генеруємо дані електростанції"""
-    stations = [
-        {"name": "Київська ТЕС", "type": "thermal", "max_power": 1200},
-        {"name": "Дніпровська ГЕС", "type": "hydro", "max_power": 800},
-        {"name": "Сонячна ферма", "type": "solar", "max_power": 150},
-        {"name": "Вітряна ферма", "type": "wind", "max_power": 200}
-    ] # Список станцій
-    
-    station = random.choice(stations) # Вибираємо випадкову станцію
+    station = random.choice(STATION_FLEET) # Вибираємо випадкову станцію з парку
     
     # Генеруємо реалістичні дані залежно від типу
     if station["type"] == "solar":
@@ -75,11 +77,121 @@ def generate_power_data():
         "voltage_kv": round(random.uniform(218, 222), 1),
         "frequency_hz": round(random.uniform(49.9, 50.1), 2),
         "efficiency_percent": round(random.uniform(82, 88), 1),
-        "kafka_version": "3.7.1" 
+        "kafka_version": KAFKA_VERSION
     } 
     
     return data 
 
+
+def percentile(sorted_values, pct):
+    """Перцентиль (nearest-rank) для вже відсортованого списку"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, int(round(pct / 100 * len(sorted_values)))) # Номер елемента (1..N)
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+class AckTracker:
+    """Обмежене вікно in-flight повідомлень та статистика підтверджень брокера"""
+
+    def __init__(self, max_in_flight):
+        self.window = threading.BoundedSemaphore(max_in_flight) # Скільки повідомлень можна мати без ack
+        self.lock = threading.Lock() # Callback-и викликаються з потоку sender-а kafka-python
+        self.latencies = [] # Затримки ack (с) за поточний інтервал звіту
+        self.acked = 0 # Всього підтверджено
+        self.failed = 0 # Всього помилок
+        self.interval_failed = 0 # Помилок за поточний інтервал звіту
+        self.last_error = None # Остання помилка доставки (для звіту)
+
+    def acquire(self):
+        """Блокуємося, якщо вікно заповнене"""
+        self.window.acquire()
+        return time.perf_counter() # Час відправки для розрахунку затримки
+
+    def on_success(self, sent_at, record_metadata):
+        with self.lock:
+            self.latencies.append(time.perf_counter() - sent_at)
+            self.acked += 1
+        self.window.release() # Звільняємо місце у вікні
+
+    def on_error(self, sent_at, exc):
+        # Без print: при падінні брокера помиляються тисячі повідомлень у польоті - лише рахуємо
+        with self.lock:
+            self.failed += 1
+            self.interval_failed += 1
+            self.last_error = exc
+        self.window.release()
+
+    def snapshot(self):
+        """Забираємо затримки та помилки за інтервал і загальні лічильники"""
+        with self.lock:
+            latencies, self.latencies = self.latencies, []
+            interval_failed, self.interval_failed = self.interval_failed, 0
+            return latencies, self.acked, self.failed, interval_failed, self.last_error
+
+
+def print_ack_report(latencies, elapsed, acked, failed, interval_failed, last_error):
+    """Виводимо acks/sec, p50/p99 затримки підтвердження та помилки за інтервал"""
+    latencies.sort()
+    rate = len(latencies) / elapsed if elapsed > 0 else 0.0
+    p50 = percentile(latencies, 50) * 1000
+    p99 = percentile(latencies, 99) * 1000
+    print(f"📈 {rate:,.0f} acks/сек | p50: {p50:.1f} мс | p99: {p99:.1f} мс | "
+          f"Підтверджено: {acked} | Помилок: {failed} (+{interval_failed})")
+    if interval_failed:
+        print(f"❌ Помилок доставки за інтервал: {interval_failed}, остання: {last_error}")
+
+
+def run_pipelined(producer):
+    """Режим пропускної здатності: відправляємо без блокування на кожному future.get()"""
+    tracker = AckTracker(MAX_IN_FLIGHT)
+    sent_count = 0 # Лічильник відправлених повідомлень
+
+    print(f"🚀 Pipelined режим: до {MAX_IN_FLIGHT} повідомлень у польоті")
+    print("📊 Натисніть Ctrl+C для зупинки\n")
+
+    start_time = time.perf_counter()
+    last_report = start_time
+
+    fleet_arrays = FleetArrays(STATION_FLEET) # Колонки парку будуємо один раз
+
+    try:
+        while True:
+            # Генеруємо цілий пакет записів за один виклик
+            for power_data in generate_power_batch(GENERATOR_BATCH, fleet_arrays):
+                # Звіт перевіряємо на кожному записі: пакет генератора при малій швидкості йде довго
+                now = time.perf_counter()
+                if now - last_report >= REPORT_INTERVAL:
+                    latencies, acked, failed, interval_failed, last_error = tracker.snapshot()
+                    print_ack_report(latencies, now - last_report, acked, failed, interval_failed, last_error)
+                    last_report = now
+
+                sent_at = tracker.acquire() # Чекаємо вільне місце у вікні
+
+                try:
+                    future = producer.send(TOPIC, power_data)
+                except Exception as e:
+                    tracker.on_error(sent_at, e) # Повідомлення не потрапило в буфер
+                    continue
+
+                # Підтвердження обробляємо в callback-ах, а не блокуючим get()
+                future.add_callback(tracker.on_success, sent_at)
+                future.add_errback(tracker.on_error, sent_at)
+                sent_count += 1
+
+    except KeyboardInterrupt:
+        print(f"\n🛑 Зупинено. Всього відправлено {sent_count} повідомлень")
+
+    finally:
+        producer.flush() # Дочікуємося підтвердження всіх повідомлень у вікні
+        latencies, acked, failed, interval_failed, last_error = tracker.snapshot()
+        print_ack_report(latencies, time.perf_counter() - last_report, acked, failed, interval_failed, last_error)
+        total_time = time.perf_counter() - start_time
+        if total_time > 0:
+            print(f"📊 Середня швидкість: {acked / total_time:,.0f} acks/сек за {total_time:.1f} с")
+        producer.close()
+        print("🔌 З'єднання з Kafka 3.7.1 закрито")
+
  
 def main():
     """Основна функція"""
@@ -87,6 +199,10 @@ def main():
     if not producer:
         return # Якщо не вдалося підключитися, виходимо
     
+    if SEND_MODE == 'pipelined':
+        run_pipelined(producer)
+        return
+
     print("🚀 Починаємо відправку даних через Kafka...")
     print("📊 Натисніть Ctrl+C для зупинки\n")
     
@@ -99,7 +215,7 @@ def main():
             
             # Відправляємо в Kafka
             try:
-                future = producer.send('power-station-data', power_data) # Відправляємо повідомлення
+                future = producer.send(TOPIC, power_data) # Відправляємо повідомлення
                 # Блокуємося, щоб отримати підтвердження від брокера
                 record_metadata = future.get(timeout=10) # Чекаємо максимум 10 секунд
                 message_count += 1 # Збільшуємо лічильник
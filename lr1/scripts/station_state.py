@@ -0,0 +1,145 @@
+import math # Імпортуємо math для стандартного відхилення
+from array import array # Імпортуємо array для компактних кільцевих буферів
+from collections import OrderedDict, deque # LRU станцій та монотонні черги для min/max
+
+# --- КОНФІГУРАЦІЯ ---
+WINDOW_SIZE = 120 # Кількість останніх показників на станцію
+MAX_STATIONS = 10000 # Максимум станцій у пам'яті (найдовше неактивні витісняються)
+MIN_SAMPLES = 20 # Скільки показників потрібно для власної базової лінії станції
+Z_THRESHOLD = 3.0 # Відхилення від базової лінії (у стандартних відхиленнях) для тривоги
+MIN_STD = 1e-6 # Захист від ділення на нуль для сталих рядів
+
+METRICS = {
+    'power': 'power_output_mw',
+    'voltage': 'voltage_kv',
+    'frequency': 'frequency_hz'
+} # Метрика -> поле в повідомленні
+
+
+class RollingWindow:
+    """
+    Кільцевий буфер фіксованого розміру з O(1) оновленням середнього та дисперсії
+    (ковзний Welford) і амортизованим O(1) min/max (монотонні черги).
+    """
+
+    __slots__ = ('values', 'size', 'count', 'position', 'seq', 'mean', 'm2', 'min_queue', 'max_queue')
+
+    def __init__(self, size):
+        self.values = array('d', bytes(8 * size)) # Нулі, 8 байт на значення
+        self.size = size
+        self.count = 0 # Скільки значень у вікні
+        self.position = 0 # Куди пишемо наступне значення
+        self.seq = 0 # Порядковий номер наступного значення
+        self.mean = 0.0
+        self.m2 = 0.0 # Сума квадратів відхилень від середнього
+        self.min_queue = deque() # (seq, value) зі зростаючими значеннями
+        self.max_queue = deque() # (seq, value) зі спадними значеннями
+
+    def push(self, value):
+        if self.count < self.size:
+            # Вікно ще не заповнене - звичайний Welford
+            self.count += 1
+            delta = value - self.mean
+            self.mean += delta / self.count
+            self.m2 += delta * (value - self.mean)
+        else:
+            # Замінюємо найстаріше значення новим
+            old = self.values[self.position]
+            old_mean = self.mean
+            self.mean += (value - old) / self.size
+            self.m2 += (value - old) * (value - self.mean + old - old_mean)
+            if self.m2 < 0.0:
+                self.m2 = 0.0 # Похибка округлення
+
+        self.values[self.position] = value
+        self.position = (self.position + 1) % self.size
+
+        # Викидаємо значення, що вийшли з вікна, та ті, що вже не можуть бути min/max
+        oldest = self.seq - self.size + 1
+        while self.min_queue and self.min_queue[0][0] < oldest:
+            self.min_queue.popleft()
+        while self.max_queue and self.max_queue[0][0] < oldest:
+            self.max_queue.popleft()
+        while self.min_queue and self.min_queue[-1][1] >= value:
+            self.min_queue.pop()
+        while self.max_queue and self.max_queue[-1][1] <= value:
+            self.max_queue.pop()
+        self.min_queue.append((self.seq, value))
+        self.max_queue.append((self.seq, value))
+        self.seq += 1
+
+    @property
+    def variance(self):
+        return self.m2 / (self.count - 1) if self.count > 1 else 0.0
+
+    @property
+    def std(self):
+        return math.sqrt(self.variance)
+
+    @property
+    def min(self):
+        return self.min_queue[0][1] if self.min_queue else None
+
+    @property
+    def max(self):
+        return self.max_queue[0][1] if self.max_queue else None
+
+
+class StationStateStore:
+    """Стан по станціях: ковзні вікна метрик та тривоги відносно власної базової лінії"""
+
+    def __init__(self, window_size=WINDOW_SIZE, max_stations=MAX_STATIONS,
+                 min_samples=MIN_SAMPLES, z_threshold=Z_THRESHOLD):
+        self.window_size = window_size
+        self.max_stations = max_stations
+        self.min_samples = min_samples
+        self.z_threshold = z_threshold
+        self.stations = OrderedDict() # Назва станції -> {метрика: RollingWindow}
+        self.evicted = 0 # Скільки станцій витіснено через ліміт пам'яті
+
+    def _windows(self, station):
+        windows = self.stations.get(station)
+        if windows is None:
+            windows = {metric: RollingWindow(self.window_size) for metric in METRICS}
+            self.stations[station] = windows
+            if len(self.stations) > self.max_stations:
+                self.stations.popitem(last=False) # Витісняємо найдовше неактивну станцію
+                self.evicted += 1
+        else:
+            self.stations.move_to_end(station)
+        return windows
+
+    def update(self, station, data):
+        """
+        Додаємо показники станції. Повертаємо список тривог
+        (метрика, значення, середнє, z), порівнюючи з базовою лінією ДО оновлення.
+        """
+        windows = self._windows(station)
+        alerts = []
+        for metric, field in METRICS.items():
+            value = data.get(field)
+            if value is None:
+                continue
+            window = windows[metric]
+            if window.count >= self.min_samples:
+                z = (value - window.mean) / max(window.std, MIN_STD)
+                if abs(z) >= self.z_threshold:
+                    alerts.append((metric, value, window.mean, z))
+            window.push(value)
+        return alerts
+
+    def stats(self, station):
+        """Поточні mean/std/min/max по метриках станції"""
+        windows = self.stations.get(station)
+        if windows is None:
+            return None
+        return {
+            metric: {'mean': w.mean, 'std': w.std, 'min': w.min, 'max': w.max, 'count': w.count}
+            for metric, w in windows.items()
+        }
+
+
+def format_alert(station, alert):
+    """Текст тривоги для виводу в консоль"""
+    metric, value, mean, z = alert
+    return f"📉 {station}: {metric} = {value} (базова лінія {mean:.2f}, z = {z:+.1f})"
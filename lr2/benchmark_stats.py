@@ -0,0 +1,80 @@
+import time
+import statistics
+from cassandra.cluster import Cluster
+from cassandra.query import SimpleStatement
+import run_simulation as sim
+
+# --- КОНФІГУРАЦІЯ ---
+BENCH_KEYSPACE = "ev_charging_network_bench"  # Окремий keyspace, щоб не чіпати дані симуляції
+SESSION_SIZES = [100_000, 1_000_000]            # Обсяги user_sessions для порівняння
+STATIONS_PER_SIZE = {100_000: 2_000, 1_000_000: 20_000}
+USERS_PER_SIZE = {100_000: 10_000, 1_000_000: 100_000}
+ITERATIONS = 5                                  # Повтори кожного способу
+SCAN_TIMEOUT = 300                              # Тайм-аут (с) для повного сканування
+
+def timed(fn, iterations=ITERATIONS):
+    """Повертає (середній час у мс, результат останнього виклику)"""
+    times = []
+    result = None
+    for _ in range(iterations):
+        start = time.perf_counter()
+        result = fn()
+        times.append(time.perf_counter() - start)
+    return statistics.mean(times) * 1000, result
+
+def full_scan_stats(session):
+    """Поточний шлях: COUNT(*) та AVG по всіх партиціях через один координатор"""
+    count = session.execute(SimpleStatement("SELECT COUNT(*) FROM user_sessions"), timeout=SCAN_TIMEOUT).one()
+    avg = session.execute(
+        SimpleStatement("SELECT AVG(total_sessions), AVG(total_energy_kwh), AVG(total_revenue) FROM station_daily_summary"),
+        timeout=SCAN_TIMEOUT
+    ).one()
+    return count[0], avg[0]
+
+def counter_stats(session):
+    """Лічильники network_stats"""
+    stats = sim.read_network_stats(session)
+    return stats.get(sim.STAT_SESSIONS, 0), stats.get(sim.STAT_SESSIONS, 0) / max(stats.get(sim.STAT_STATION_DAYS, 0), 1)
+
+def token_range_stats(session):
+    """Паралельна агрегація по діапазонах токенів"""
+    stats = sim.scan_network_stats(session)
+    return stats[sim.STAT_SESSIONS], stats[sim.STAT_SESSIONS] / max(stats[sim.STAT_STATION_DAYS], 1)
+
+def reset_tables(session):
+    for table in ['port_status', 'user_sessions', 'station_daily_summary', 'station_hourly_analytics', 'network_stats']:
+        session.execute(SimpleStatement(f"TRUNCATE {table}"), timeout=SCAN_TIMEOUT)
+
+def main():
+    cluster = Cluster(['127.0.0.1'])
+    session = cluster.connect()
+
+    # Функції симуляції читають глобальні налаштування модуля
+    sim.KEYSPACE = BENCH_KEYSPACE
+    sim.create_schema(session)
+
+    print(f"\n{'Сесій':>10} | {'Спосіб':<28} | {'Avg, мс':>10} | {'Сесій знайдено':>14}")
+    print("-" * 72)
+
+    for n_sessions in SESSION_SIZES:
+        reset_tables(session)
+        sim.N_SESSIONS = n_sessions
+        sim.STATION_COUNT = STATIONS_PER_SIZE[n_sessions]
+        sim.N_USERS = USERS_PER_SIZE[n_sessions]
+        sim.generate_and_insert_data(session)
+
+        for name, fn in [
+            ("COUNT(*) + AVG (скан)", lambda: full_scan_stats(session)),
+            (f"Token-range ({sim.TOKEN_RANGE_SPLITS} діап.)", lambda: token_range_stats(session)),
+            ("Лічильники network_stats", lambda: counter_stats(session)),
+        ]:
+            try:
+                avg_ms, (count, _) = timed(fn)
+                print(f"{n_sessions:>10,} | {name:<28} | {avg_ms:10.2f} | {count:>14,}")
+            except Exception as e:
+                print(f"{n_sessions:>10,} | {name:<28} | Помилка: {e}")
+
+    cluster.shutdown()
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,12 @@
 import uuid
+import time
 import random
+from collections import defaultdict
 from datetime import datetime, timedelta, date
 from decimal import Decimal
 from cassandra.cluster import Cluster
+from cassandra.concurrent import execute_concurrent
+from cassandra.query import BatchStatement, BatchType
 
 KEYSPACE = "ev_charging_network"
 STATION_COUNT = 20 
@@ -10,6 +14,20 @@ PORTS_PER_STATION = 4
 N_SESSIONS = 500
 N_USERS = 100
 SIMULATION_DATE = date(2025, 11, 14)
+CONCURRENCY = 100          # Кількість паралельних запитів до Cassandra
+MAX_BATCH_ROWS = 50        # Максимум рядків однієї партиції в UNLOGGED batch
+TOKEN_RANGE_SPLITS = 64    # Кількість діапазонів токенів для паралельної агрегації
+
+# Лічильники network_stats (енергія та дохід у цілих одиницях, бо counter - це bigint)
+STAT_SESSIONS = 'user_sessions'
+STAT_STATION_DAYS = 'station_days'
+STAT_ENERGY_WH = 'energy_wh'
+STAT_REVENUE_CENTS = 'revenue_cents'
+
+SECONDS_PER_DAY = 24 * 60 * 60
+
+MIN_TOKEN = -2 ** 63       # Діапазон токенів Murmur3Partitioner
+MAX_TOKEN = 2 ** 63 - 1
 
 def create_schema(session):
     """
@@ -76,83 +94,264 @@ def create_schema(session):
             PRIMARY KEY ((station_id, summary_date), hour_of_day)
         );
     """)
+
+    # Лічильники замість COUNT(*)/AVG по всіх партиціях
+    session.execute("""
+        CREATE TABLE IF NOT EXISTS network_stats (
+            stat_name text PRIMARY KEY,
+            value counter
+        );
+    """)
     print("Схему успішно створено/перевірено.")
 
+def iter_partition_batches(stmt, rows):
+    """
+    Рядки ОДНІЄЇ партиції -> UNLOGGED batch-і до MAX_BATCH_ROWS рядків.
+    Batch в межах партиції - це один мутаційний запис на координаторі, а не мультипартиційна транзакція.
+    """
+    for i in range(0, len(rows), MAX_BATCH_ROWS):
+        batch = BatchStatement(batch_type=BatchType.UNLOGGED)
+        for params in rows[i:i + MAX_BATCH_ROWS]:
+            batch.add(stmt, params)
+        yield batch, ()
+
+def write_concurrent(session, statements_and_params):
+    """
+    Виконує потік (statement, params) з CONCURRENCY запитами в польоті.
+    results_generator=True не накопичує результати, тож пам'ять не росте з обсягом даних.
+    """
+    count = 0
+    for _ in execute_concurrent(session, statements_and_params, concurrency=CONCURRENCY,
+                                raise_on_first_error=True, results_generator=True):
+        count += 1
+    return count
+
+class StationRollups:
+    """
+    Агрегати по станціях, що оновлюються інкрементально з кожною сесією:
+    - добові (station_id, summary_date): кількість сесій, енергія, дохід, сумарна тривалість
+    - погодинні (station_id, summary_date, hour): кількість сесій, сума та пік середньої потужності сесій
+    Змінені ключі запам'ятовуються, тож записувати потрібно лише їх, без повторного сканування сесій.
+    Обмеження: стан живе лише в пам'яті одного процесу й починається з нуля, а рядки агрегатів
+    пишуться звичайним INSERT - вони перезаписуються повністю, а не додаються до наявних.
+    Тож агрегати правильні лише для одного запуску генерації в порожній keyspace (main() генерує
+    лише тоді, коли сесій ще немає); повторний запуск чи кілька процесів затерли б попередні підсумки.
+    """
+
+    def __init__(self):
+        self.daily = {}   # (station_id, date) -> [sessions, energy_kwh, revenue, duration_min]
+        self.hourly = {}  # (station_id, date, hour) -> [sessions, power_sum_kw, peak_power_kw]
+        self.dirty_days = set()  # (station_id, date), які треба перезаписати
+        self.counter_deltas = defaultdict(int)  # stat_name -> приріст для network_stats
+
+    def ensure_station_day(self, station_id, day):
+        """Гарантує нульові рядки для станції без сесій за день"""
+        if (station_id, day) not in self.daily:
+            self.daily[(station_id, day)] = [0, 0.0, Decimal('0.00'), 0]
+            for hour in range(24):
+                self.hourly[(station_id, day, hour)] = [0, 0.0, 0.0]
+            self.dirty_days.add((station_id, day))
+            self.counter_deltas[STAT_STATION_DAYS] += 1
+
+    def add_session(self, station_id, start_time, end_time, energy_kwh, cost):
+        """Враховує одну сесію (значення ті ж, що записані в user_sessions)"""
+        day = start_time.date()
+        self.ensure_station_day(station_id, day)
+        duration_min = (end_time - start_time).total_seconds() / 60
+        avg_power = energy_kwh / (duration_min / 60) if duration_min > 0 else 0.0
+
+        daily = self.daily[(station_id, day)]
+        daily[0] += 1
+        daily[1] += energy_kwh
+        daily[2] += cost
+        daily[3] += duration_min
+
+        hourly = self.hourly[(station_id, day, start_time.hour)]
+        hourly[0] += 1
+        hourly[1] += avg_power
+        hourly[2] = max(hourly[2], avg_power)
+
+        self.dirty_days.add((station_id, day))
+        self.counter_deltas[STAT_SESSIONS] += 1
+        self.counter_deltas[STAT_ENERGY_WH] += round(energy_kwh * 1000)
+        self.counter_deltas[STAT_REVENUE_CENTS] += int(cost * 100)
+
+    def daily_row(self, station_id, day):
+        sessions, energy, revenue, duration = self.daily[(station_id, day)]
+        avg_duration = round(duration / sessions) if sessions else 0
+        return [station_id, day, sessions, round(energy, 2), revenue, avg_duration]
+
+    def hourly_rows(self, station_id, day):
+        rows = []
+        for hour in range(24):
+            sessions, power_sum, peak = self.hourly[(station_id, day, hour)]
+            avg_power = power_sum / sessions if sessions else 0.0
+            rows.append([station_id, day, hour, sessions, round(avg_power, 2), round(peak, 2)])
+        return rows
+
+    def take_counter_deltas(self):
+        """Повертає накопичені прирости лічильників та очищає їх"""
+        deltas, self.counter_deltas = dict(self.counter_deltas), defaultdict(int)
+        return deltas
+
+    def take_dirty(self):
+        """Повертає змінені (station_id, date) та очищає список"""
+        dirty, self.dirty_days = self.dirty_days, set()
+        return sorted(dirty, key=lambda key: (str(key[0]), key[1]))
+
+def prepare_statements(session):
+    """Prepared statements для всіх таблиць симуляції"""
+    return {
+        'port_status': session.prepare(
+            "INSERT INTO port_status (station_id, port_id, status, power_kw, current_session_start) VALUES (?, ?, ?, ?, ?)"
+        ),
+        'user_sessions': session.prepare(
+            "INSERT INTO user_sessions (user_id, start_time, end_time, station_id, port_id, energy_consumed_kwh, session_cost) VALUES (?, ?, ?, ?, ?, ?, ?)"
+        ),
+        'daily': session.prepare(
+            "INSERT INTO station_daily_summary (station_id, summary_date, total_sessions, total_energy_kwh, total_revenue, avg_session_duration_min) VALUES (?, ?, ?, ?, ?, ?)"
+        ),
+        'hourly': session.prepare(
+            "INSERT INTO station_hourly_analytics (station_id, summary_date, hour_of_day, session_count, avg_power_kw, peak_power_kw) VALUES (?, ?, ?, ?, ?, ?)"
+        ),
+        'stats': session.prepare(
+            "UPDATE network_stats SET value = value + ? WHERE stat_name = ?"
+        ),
+    }
+
+def counter_statements(statements, deltas):
+    """
+    Запити приросту лічильників. Counter-оновлення не ідемпотентні,
+    тому виконуються лише після успішного запису самих даних.
+    """
+    for stat_name, delta in deltas.items():
+        if delta:
+            yield statements['stats'], [delta, stat_name]
+
+def read_network_stats(session):
+    """Читає всі лічильники network_stats (одна маленька партиція на лічильник)"""
+    return {row.stat_name: row.value for row in session.execute("SELECT stat_name, value FROM network_stats")}
+
+def token_ranges(splits=TOKEN_RANGE_SPLITS):
+    """Ділить кільце токенів на splits непересічних діапазонів [start, end]"""
+    step = (MAX_TOKEN - MIN_TOKEN) // splits
+    bounds = [MIN_TOKEN + i * step for i in range(splits)] + [MAX_TOKEN]
+    return [(bounds[i] if i == 0 else bounds[i] + 1, bounds[i + 1]) for i in range(splits)]
+
+def token_range_aggregate(session, table, partition_key, columns, splits=TOKEN_RANGE_SPLITS):
+    """
+    Паралельна агрегація по діапазонах токенів: кожен запит читає лише свою частину кільця,
+    тож запити розходяться по різних вузлах, а не йдуть одним повним скануванням через координатор.
+    Повертає список рядків (по одному на діапазон) для підсумовування на клієнті.
+    """
+    stmt = session.prepare(
+        f"SELECT {columns} FROM {table} WHERE token({partition_key}) >= ? AND token({partition_key}) <= ?"
+    )
+    results = execute_concurrent(session, [(stmt, bounds) for bounds in token_ranges(splits)],
+                                 concurrency=CONCURRENCY, raise_on_first_error=True)
+    return [result.one() for _, result in results]
+
+def scan_network_stats(session, splits=TOKEN_RANGE_SPLITS):
+    """Обчислює ті ж показники, що зберігаються в network_stats, паралельним скануванням"""
+    session_rows = token_range_aggregate(session, 'user_sessions', 'user_id', 'COUNT(*)', splits)
+    daily_rows = token_range_aggregate(
+        session, 'station_daily_summary', 'station_id',
+        'COUNT(*), SUM(total_energy_kwh), SUM(total_revenue)', splits
+    )
+    return {
+        STAT_SESSIONS: sum(row[0] for row in session_rows),
+        STAT_STATION_DAYS: sum(row[0] for row in daily_rows),
+        STAT_ENERGY_WH: round(sum(row[1] or 0.0 for row in daily_rows) * 1000),
+        STAT_REVENUE_CENTS: int(sum(row[2] or Decimal('0') for row in daily_rows) * 100),
+    }
+
+def rebuild_network_stats(session, statements):
+    """Заповнює порожні лічильники для даних, вставлених до появи network_stats"""
+    stats = scan_network_stats(session)
+    write_concurrent(session, counter_statements(statements, stats))
+    return stats
+
+def rollup_statements(statements, rollups):
+    """Запити для змінених агрегатів: 1 рядок добового та batch із 24 годин на партицію"""
+    for station_id, day in rollups.take_dirty():
+        yield statements['daily'], rollups.daily_row(station_id, day)
+        yield from iter_partition_batches(statements['hourly'], rollups.hourly_rows(station_id, day))
+
 def generate_and_insert_data(session):
     """
     Генерує та вставляє тестові дані.
+    Добові та погодинні агрегати обчислюються з тих самих сесій за один прохід
+    і перезаписують наявні рядки, тому викликати лише для порожнього keyspace (див. StationRollups).
     Повертає ID станції та ID користувача для подальшого аналізу.
     """
     print("\nПочаток генерації та вставки даних...")
+    load_start = time.time()
 
     station_ids = [uuid.uuid4() for _ in range(STATION_COUNT)]
     user_ids = [uuid.uuid4() for _ in range(N_USERS)]
 
-    insert_status_stmt = session.prepare(
-        "INSERT INTO port_status (station_id, port_id, status, power_kw, current_session_start) VALUES (?, ?, ?, ?, ?)"
-    )
-    insert_session_stmt = session.prepare(
-        "INSERT INTO user_sessions (user_id, start_time, end_time, station_id, port_id, energy_consumed_kwh, session_cost) VALUES (?, ?, ?, ?, ?, ?, ?)"
-    )
-    insert_daily_stmt = session.prepare(
-        "INSERT INTO station_daily_summary (station_id, summary_date, total_sessions, total_energy_kwh, total_revenue, avg_session_duration_min) VALUES (?, ?, ?, ?, ?, ?)"
-    )
-    insert_hourly_stmt = session.prepare(
-        "INSERT INTO station_hourly_analytics (station_id, summary_date, hour_of_day, session_count, avg_power_kw, peak_power_kw) VALUES (?, ?, ?, ?, ?, ?)"
-    )
+    statements = prepare_statements(session)
+    rollups = StationRollups()
+    for station_id in station_ids:
+        rollups.ensure_station_day(station_id, SIMULATION_DATE)
+
+    def port_status_batches():
+        # Партиція port_status = station_id: всі порти станції в одному batch
+        for station_id in station_ids:
+            rows = []
+            for port_id in range(1, PORTS_PER_STATION + 1):
+                status = random.choice(['available', 'charging', 'offline'])
+                start_time = None
+                power = 0.0
+                if status == 'charging':
+                    start_time = datetime.now() - timedelta(minutes=random.randint(5, 45))
+                    power = random.choice([11.0, 22.0, 50.0])
+                rows.append([station_id, port_id, status, power, start_time])
+            yield from iter_partition_batches(statements['port_status'], rows)
 
     print(f"Вставка даних у 'port_status' ({STATION_COUNT * PORTS_PER_STATION} записів)...")
-    for station_id in station_ids:
-        for port_id in range(1, PORTS_PER_STATION + 1):
-            status = random.choice(['available', 'charging', 'offline'])
-            start_time = None
-            power = 0.0
-            if status == 'charging':
-                start_time = datetime.now() - timedelta(minutes=random.randint(5, 45))
-                power = random.choice([11.0, 22.0, 50.0])
-            session.execute(insert_status_stmt, [station_id, port_id, status, power, start_time])
+    write_concurrent(session, port_status_batches())
+
+    def user_session_batches():
+        # Розподіл сесій між користувачами такий самий, як при random.choice(user_ids) для кожної сесії,
+        # але сесії генеруються по користувачах, щоб групувати їх у batch-і за партицією user_id
+        sessions_per_user = [0] * N_USERS
+        for _ in range(N_SESSIONS):
+            sessions_per_user[random.randrange(N_USERS)] += 1
+
+        for user_id, n_user_sessions in zip(user_ids, sessions_per_user):
+            rows = []
+            # Ключ user_sessions - (user_id, start_time): однаковий час початку перезаписав би рядок,
+            # а агрегати та лічильники врахували б обидві сесії. Тому секунди початку різні в межах
+            # користувача; якщо сесій більше, ніж секунд у добі, вони переходять на наступні дні
+            day_start = datetime(SIMULATION_DATE.year, SIMULATION_DATE.month, SIMULATION_DATE.day)
+            for start_second in random.sample(range(max(SECONDS_PER_DAY, n_user_sessions)), n_user_sessions):
+                start_time = day_start + timedelta(seconds=start_second)
+                duration_min = random.randint(20, 180)
+                end_time = start_time + timedelta(minutes=duration_min)
+                energy = round((duration_min / 60) * random.uniform(7.0, 22.0), 2)
+                cost = Decimal(str(energy * random.uniform(0.45, 0.55))).quantize(Decimal('0.01'))
+                station_id = random.choice(station_ids)
+                rows.append([
+                    user_id, start_time, end_time,
+                    station_id, random.randint(1, PORTS_PER_STATION),
+                    energy, cost
+                ])
+                # Агрегати рахуються в тому ж проході, що й генерація сесій
+                rollups.add_session(station_id, start_time, end_time, energy, cost)
+            yield from iter_partition_batches(statements['user_sessions'], rows)
 
     print(f"Вставка даних у 'user_sessions' ({N_SESSIONS} записів)...")
-    for _ in range(N_SESSIONS):
-        start_hour = random.randint(0, 23)
-        start_minute = random.randint(0, 59)
-        start_time = datetime(SIMULATION_DATE.year, SIMULATION_DATE.month, SIMULATION_DATE.day, start_hour, start_minute)
-        duration_min = random.randint(20, 180)
-        end_time = start_time + timedelta(minutes=duration_min)
-        energy = (duration_min / 60) * random.uniform(7.0, 22.0)
-        cost = Decimal(str(energy * random.uniform(0.45, 0.55)))
-        session.execute(insert_session_stmt, [
-            random.choice(user_ids), start_time, end_time,
-            random.choice(station_ids), random.randint(1, PORTS_PER_STATION),
-            round(energy, 2), cost.quantize(Decimal('0.01'))
-        ])
-
-    print(f"Вставка даних у 'station_daily_summary' ({STATION_COUNT} записів)...")
-    for station_id in station_ids:
-        total_sess = random.randint(15, 70)
-        total_nrg = total_sess * random.uniform(10.0, 15.0)
-        total_rev = Decimal(str(total_nrg * 0.5))
-        session.execute(insert_daily_stmt, [
-            station_id, SIMULATION_DATE, total_sess,
-            round(total_nrg, 2), total_rev.quantize(Decimal('0.01')),
-            random.randint(30, 90)
-        ])
-
-    print(f"Вставка даних у 'station_hourly_analytics' ({STATION_COUNT * 24} записів)...")
-    for station_id in station_ids:
-        for hour in range(24):
-            if 6 <= hour <= 22:
-                count, avg_pwr, peak_pwr = random.randint(2, 8), random.uniform(11.0, 22.0), random.uniform(22.0, 50.0)
-            else:
-                count = random.randint(0, 2)
-                avg_pwr = random.uniform(7.0, 11.0) if count > 0 else 0.0
-                peak_pwr = random.uniform(avg_pwr, 22.0) if count > 0 else 0.0
-            session.execute(insert_hourly_stmt, [
-                station_id, SIMULATION_DATE, hour,
-                count, round(avg_pwr, 2), round(peak_pwr, 2)
-            ])
+    write_concurrent(session, user_session_batches())
+
+    print(f"Вставка агрегатів у 'station_daily_summary' ({STATION_COUNT} записів) "
+          f"та 'station_hourly_analytics' ({STATION_COUNT * 24} записів)...")
+    write_concurrent(session, rollup_statements(statements, rollups))
+
+    print("Оновлення лічильників 'network_stats'...")
+    write_concurrent(session, counter_statements(statements, rollups.take_counter_deltas()))
             
-    print("Всі дані успішно згенеровано та вставлено.")
+    print(f"Всі дані успішно згенеровано та вставлено за {time.time() - load_start:.2f} с.")
     
     return random.choice(station_ids), random.choice(user_ids)
 
@@ -162,24 +361,25 @@ def perform_analysis(session, station_id_to_check, user_id_to_check):
     """
     print("\n--- Початок аналізу даних ---")
 
+    stats = {}
     try:
-        count_result = session.execute("SELECT COUNT(*) FROM user_sessions").one()
+        stats = read_network_stats(session)
         print(f"\n1. Загальна кількість записів:")
-        print(f"   - Всього згенеровано сесій: {count_result.count}")
+        print(f"   - Всього згенеровано сесій: {stats.get(STAT_SESSIONS, 0)}")
     except Exception as e:
-        print(f"Помилка при підрахунку COUNT(*): {e}")
+        print(f"Помилка при читанні лічильників: {e}")
 
     try:
-        avg_result = session.execute(
-            "SELECT AVG(total_sessions), AVG(total_energy_kwh), AVG(total_revenue) FROM station_daily_summary"
-        ).one()
-        
+        station_days = stats.get(STAT_STATION_DAYS, 0)
+        if station_days == 0:
+            raise ValueError("немає добових агрегатів")
+
         print(f"\n2. Середні показники (на станцію за добу):")
-        print(f"   - Середня кількість сесій: {avg_result.system_avg_total_sessions:.1f}")
-        print(f"   - Середнє споживання енергії: {avg_result.system_avg_total_energy_kwh:.2f} кВт*год")
-        print(f"   - Середній дохід: {avg_result.system_avg_total_revenue:.2f} у.о.")
+        print(f"   - Середня кількість сесій: {stats.get(STAT_SESSIONS, 0) / station_days:.1f}")
+        print(f"   - Середнє споживання енергії: {stats.get(STAT_ENERGY_WH, 0) / 1000 / station_days:.2f} кВт*год")
+        print(f"   - Середній дохід: {stats.get(STAT_REVENUE_CENTS, 0) / 100 / station_days:.2f} у.о.")
     except Exception as e:
-        print(f"Помилка при розрахунку AVG: {e}")
+        print(f"Помилка при розрахунку середніх: {e}")
 
     try:
         print(f"\n3. Приклад оперативних даних (стан портів станції {station_id_to_check}):")
@@ -226,13 +426,17 @@ def main():
 
         print("\nПеревірка наявності даних...")
         
-        count_row = session.execute("SELECT COUNT(*) FROM user_sessions").one()
+        stats = read_network_stats(session)
+        if not stats and session.execute("SELECT user_id FROM user_sessions LIMIT 1").one():
+            print("Лічильники порожні, але дані є - заповнюємо 'network_stats' паралельним скануванням...")
+            stats = rebuild_network_stats(session, prepare_statements(session))
+        total_sessions = stats.get(STAT_SESSIONS, 0)
         
-        if count_row.count == 0:
+        if total_sessions == 0:
             print("База даних порожня. Запускаємо генерацію даних...")
             analysis_station_id, analysis_user_id = generate_and_insert_data(session)
         else:
-            print(f"Дані вже існують ({count_row.count} сесій). Пропускаємо генерацію.")
+            print(f"Дані вже існують ({total_sessions} сесій). Пропускаємо генерацію.")
             print("Отримання ID з існуючих даних для аналізу...")
             
             try:
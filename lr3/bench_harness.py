@@ -0,0 +1,209 @@
+import os
+import csv
+import json
+import math
+import time
+import tracemalloc
+from datetime import datetime
+
+# --- КОНФІГУРАЦІЯ ---
+ITERATIONS = 50            # Вимірювань на сценарій за замовчуванням
+WARMUP = 5                 # Прогрівальних запусків (не враховуються: prepare, кеші, JIT драйвера)
+PERCENTILES = [50, 95, 99]
+CONFIDENCE_Z = 1.96        # 95% довірчий інтервал для перцентилів
+SUB_BUCKET_BITS = 7        # Точність гістограми: відносна похибка <= 1/2^7 (~0.8%)
+RESULTS_DIR = 'bench_results'
+TRACK_MEMORY = True        # Окремий прогін під tracemalloc для піку пам'яті (не впливає на час)
+
+
+class LatencyHistogram:
+    """
+    Гістограма затримок у стилі HDR: значення (мкс) групуються в логарифмічні
+    діапазони з 2^SUB_BUCKET_BITS лінійних під-бакетів у кожному, тож відносна похибка
+    однакова на всьому діапазоні, а пам'ять не залежить від кількості вимірювань.
+    """
+
+    def __init__(self):
+        self.counts = {}
+        self.count = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = 0.0
+
+    def record(self, seconds):
+        value = max(1, int(seconds * 1_000_000))
+        shift = max(0, value.bit_length() - SUB_BUCKET_BITS - 1)
+        bucket = (value >> shift) << shift
+        self.counts[(bucket, shift)] = self.counts.get((bucket, shift), 0) + 1
+        self.count += 1
+        self.total += seconds
+        self.min = min(self.min, seconds)
+        self.max = max(self.max, seconds)
+
+    def value_at_rank(self, rank):
+        """Значення (с) rank-го за величиною вимірювання (1..count) - середина його бакета"""
+        seen = 0
+        for bucket, shift in sorted(self.counts):
+            seen += self.counts[(bucket, shift)]
+            if seen >= rank:
+                return (bucket + ((1 << shift) - 1) / 2) / 1_000_000
+        return self.max
+
+    def mean(self):
+        return self.total / self.count if self.count else 0.0
+
+    def percentile(self, p):
+        """Перцентиль за nearest-rank (без інтерполяції між сусідніми вимірюваннями)"""
+        return self.value_at_rank(max(1, math.ceil(p / 100 * self.count)))
+
+    def percentile_ci(self, p, z=CONFIDENCE_Z):
+        """
+        Непараметричний довірчий інтервал перцентиля за порядковими статистиками:
+        ранги n*q -/+ z*sqrt(n*q*(1-q)). При малій кількості вимірювань інтервал для p99
+        впирається в максимум - це сигнал, що ітерацій замало.
+        """
+        n, q = self.count, p / 100
+        spread = z * math.sqrt(n * q * (1 - q))
+        low = min(n, max(1, math.floor(n * q - spread)))
+        high = min(n, max(1, math.ceil(n * q + spread) + 1))
+        return self.value_at_rank(low), self.value_at_rank(high)
+
+
+class BenchmarkResult:
+    def __init__(self, group, name, histogram, error=None, peak_bytes=None):
+        self.group = group
+        self.name = name
+        self.histogram = histogram
+        self.error = error
+        self.peak_bytes = peak_bytes
+
+    def as_dict(self):
+        """Плоский запис для JSON/CSV (час у мс)"""
+        h = self.histogram
+        row = {'group': self.group, 'name': self.name, 'iterations': h.count, 'error': self.error,
+               'peak_kb': self.peak_bytes / 1024 if self.peak_bytes is not None else None,
+               'avg_ms': h.mean() * 1000, 'min_ms': (h.min if h.count else 0) * 1000, 'max_ms': h.max * 1000}
+        for p in PERCENTILES:
+            low, high = h.percentile_ci(p) if h.count else (0, 0)
+            row[f'p{p}_ms'] = (h.percentile(p) if h.count else 0) * 1000
+            row[f'p{p}_ci_low_ms'] = low * 1000
+            row[f'p{p}_ci_high_ms'] = high * 1000
+        return row
+
+
+class BenchmarkSuite:
+    """
+    Декларативний набір сценаріїв: сценарій - іменована функція без аргументів,
+    що виконує один запит (або серію запитів, як 24 погодинні bucket-и).
+    run() прогріває, вимірює та друкує таблицю; export() зберігає результати в JSON і CSV.
+    """
+
+    def __init__(self, name, iterations=ITERATIONS, warmup=WARMUP):
+        self.name = name
+        self.iterations = iterations
+        self.warmup = warmup
+        self.scenarios = []
+
+    def add(self, group, name, fn, iterations=None, warmup=None):
+        self.scenarios.append((group, name, fn, iterations or self.iterations,
+                               self.warmup if warmup is None else warmup))
+
+    def scenario(self, group, name, iterations=None, warmup=None):
+        """Декоратор: @suite.scenario("1. Latest 100", "Schema 1 (Simple)")"""
+        def register(fn):
+            self.add(group, name, fn, iterations, warmup)
+            return fn
+        return register
+
+    def run(self):
+        print(f"\n ЗАПУСК BENCHMARK '{self.name}' (Iter: {self.iterations}, Warmup: {self.warmup})")
+        print("=" * 100)
+        results = []
+        current_group = None
+        for group, name, fn, iterations, warmup in self.scenarios:
+            if group != current_group:
+                print(f"\n--- {group} ---")
+                current_group = group
+            result = measure(group, name, fn, iterations, warmup)
+            print_result(result)
+            results.append(result)
+        return results
+
+    def export(self, results, results_dir=RESULTS_DIR):
+        """Зберігає результати запуску в JSON і CSV з міткою часу; повертає шлях до JSON"""
+        os.makedirs(results_dir, exist_ok=True)
+        stamp = datetime.now().strftime('%Y%m%dT%H%M%S')
+        base = os.path.join(results_dir, f"{self.name}_{stamp}")
+        rows = [r.as_dict() for r in results]
+
+        with open(base + '.json', 'w') as f:
+            json.dump({'suite': self.name, 'timestamp': stamp, 'results': rows}, f, indent=2, ensure_ascii=False)
+        with open(base + '.csv', 'w', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=list(rows[0].keys()) if rows else ['group', 'name'])
+            writer.writeheader()
+            writer.writerows(rows)
+
+        print(f"\nРезультати збережено: {base}.json, {base}.csv")
+        return base + '.json'
+
+
+def peak_memory(fn):
+    """Пік виділеної Python-пам'яті (байт) під час одного виклику fn"""
+    tracemalloc.start()
+    try:
+        fn()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def measure(group, name, fn, iterations=ITERATIONS, warmup=WARMUP, track_memory=TRACK_MEMORY):
+    """Прогрів + iterations вимірювань однієї функції (+ окремий прогін для піку пам'яті)"""
+    histogram = LatencyHistogram()
+    try:
+        for _ in range(warmup):
+            fn()
+        for _ in range(iterations):
+            start = time.perf_counter()
+            fn()
+            histogram.record(time.perf_counter() - start)
+        peak_bytes = peak_memory(fn) if track_memory else None
+    except Exception as e:
+        return BenchmarkResult(group, name, histogram, error=str(e))
+    return BenchmarkResult(group, name, histogram, peak_bytes=peak_bytes)
+
+
+def print_result(result):
+    """Avg і перцентилі (мс) з довірчими інтервалами"""
+    h = result.histogram
+    if result.error or not h.count:
+        print(f"🔹 {result.name:<35} | Помилка або немає даних{': ' + result.error if result.error else ''}")
+        return
+    parts = [f"Avg: {h.mean() * 1000:6.2f}ms"]
+    for p in PERCENTILES:
+        low, high = h.percentile_ci(p)
+        parts.append(f"p{p}: {h.percentile(p) * 1000:6.2f}ms [{low * 1000:.2f}-{high * 1000:.2f}]")
+    if result.peak_bytes is not None:
+        parts.append(f"Mem: {result.peak_bytes / 1024:8.1f}KB")
+    print(f" {result.name:<35} | " + " | ".join(parts))
+
+
+def load_results(path):
+    """Результати попереднього запуску з JSON: {(group, name): запис}"""
+    with open(path) as f:
+        data = json.load(f)
+    return {(row['group'], row['name']): row for row in data['results']}
+
+
+def compare_results(results, previous_path, metric='p50_ms'):
+    """Друкує зміну метрики відносно попереднього запуску (наприклад, після зміни схеми)"""
+    previous = load_results(previous_path)
+    print(f"\nПОРІВНЯННЯ З {previous_path} ({metric})")
+    print("-" * 100)
+    for result in results:
+        old = previous.get((result.group, result.name))
+        if old is None or result.error or not result.histogram.count:
+            continue
+        new_value = result.as_dict()[metric]
+        change = (new_value - old[metric]) / old[metric] * 100 if old[metric] else 0.0
+        print(f" {result.group[:30]:<30} | {result.name:<35} | {old[metric]:8.2f} -> {new_value:8.2f} ms ({change:+6.1f}%)")
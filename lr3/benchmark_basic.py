@@ -1,163 +1,135 @@
-import time
-import statistics
-import uuid
 from datetime import datetime, timedelta
 from cassandra.cluster import Cluster
 from cassandra.query import SimpleStatement
+from bench_harness import BenchmarkSuite, compare_results
+from bucket_reads import fanout_read, sequential_read, stream_rows, aggregate_power
+from rollups import SELECT_HOURLY_ROLLUP, SELECT_DAILY_ROLLUP, SELECT_DAILY_ROLLUP_RANGE
 
 # --- КОНФІГУРАЦІЯ ---
 KEYSPACE = 'lab3_ev_network'
 ITERATIONS = 50  # Кількість повторів для статистики
-
-def print_stats(name, latencies):
-    """Виводить статистику (Avg, p50, p95, p99) у мілісекундах"""
-    if not latencies:
-        print(f"🔹 {name:<35} | Помилка або немає даних")
-        return
-        
-    # Переводимо в мс
-    latencies_ms = [t * 1000 for t in latencies]
-    avg = statistics.mean(latencies_ms)
-    p50 = statistics.median(latencies_ms)
-    p95 = sorted(latencies_ms)[int(len(latencies_ms) * 0.95)]
-    p99 = sorted(latencies_ms)[int(len(latencies_ms) * 0.99)]
-    
-    print(f" {name:<35} | Avg: {avg:6.2f}ms | p50: {p50:6.2f}ms | p95: {p95:6.2f}ms | p99: {p99:6.2f}ms")
+WARMUP = 5       # Прогрівальні запити перед вимірюванням
+COMPARE_WITH = None  # Шлях до JSON попереднього запуску (bench_results/...) для порівняння
 
 def run_benchmark(session, station_id):
-    print(f"\n ЗАПУСК BENCHMARK (Iter: {ITERATIONS}, Station: {station_id})")
-    print("=" * 100)
-    
+    suite = BenchmarkSuite('benchmark_basic', iterations=ITERATIONS, warmup=WARMUP)
+    print(f"\n Station: {station_id}")
+
     # Підготовка дат (середина періоду симуляції)
     now = datetime(2024, 1, 15, 12, 0, 0) 
     six_hours_ago = now - timedelta(hours=6)
     start_of_day = now.replace(hour=0, minute=0, second=0, microsecond=0)
     end_of_day = now.replace(hour=23, minute=59, second=59, microsecond=999999)
+    month_start = datetime(2024, 1, 1)
+    month_end = datetime(2024, 1, 31, 23, 59, 59)
     
     # Buckets
     hour_bucket = int(now.strftime('%Y%m%d%H'))
     day_bucket = now.date()
+    buckets_6h = [int((now - timedelta(hours=h)).strftime('%Y%m%d%H')) for h in range(6)]
+    buckets_24h = [int((start_of_day + timedelta(hours=h)).strftime('%Y%m%d%H')) for h in range(24)]
+
+    latest_simple = session.prepare("SELECT * FROM charging_events_simple WHERE station_id = ? LIMIT 100")
+    latest_hourly = session.prepare("SELECT * FROM charging_events_hourly WHERE station_id = ? AND hour_bucket = ? LIMIT 100")
+    # Явний ORDER BY ... DESC: кожен bucket віддає свої найновіші рядки незалежно від CLUSTERING ORDER таблиці,
+    # тож злиття з reverse=True завжди відповідає порядку потоків
+    latest_hourly_desc = session.prepare(
+        "SELECT * FROM charging_events_hourly WHERE station_id = ? AND hour_bucket = ? ORDER BY event_time DESC LIMIT 100"
+    )
+    latest_daily = session.prepare("SELECT * FROM charging_sessions_daily WHERE station_id = ? AND day_bucket = ? LIMIT 100")
+    range_simple = session.prepare("SELECT * FROM charging_events_simple WHERE station_id = ? AND event_time >= ? AND event_time <= ?")
+    bucket_hourly = session.prepare("SELECT * FROM charging_events_hourly WHERE station_id = ? AND hour_bucket = ?")
+    # Для злиття за зростанням event_time (reverse=False) порядок кожного bucket-а задається явно
+    bucket_hourly_asc = session.prepare(
+        "SELECT * FROM charging_events_hourly WHERE station_id = ? AND hour_bucket = ? ORDER BY event_time ASC"
+    )
+    range_daily = session.prepare("SELECT * FROM charging_sessions_daily WHERE station_id = ? AND day_bucket = ? AND event_time >= ? AND event_time <= ?")
+    bucket_daily = session.prepare("SELECT * FROM charging_sessions_daily WHERE station_id = ? AND day_bucket = ?")
+    # Агрегати, пораховані під час генерації (generate_data_all.py / generate_data_parallel.py)
+    hourly_rollup = session.prepare(SELECT_HOURLY_ROLLUP)
+    daily_rollup = session.prepare(SELECT_DAILY_ROLLUP)
+    daily_rollup_range = session.prepare(SELECT_DAILY_ROLLUP_RANGE)
 
     # -------------------------------------------------------------------------
     # QUERY 1: LATEST DATA (LIMIT 100)
     # -------------------------------------------------------------------------
-    print("\n--- 1. Query: Latest 100 records ---")
-    
-    # Schema 1
-    stmt = session.prepare("SELECT * FROM charging_events_simple WHERE station_id = ? LIMIT 100")
-    times = []
-    for _ in range(ITERATIONS):
-        start = time.perf_counter()
-        session.execute(stmt, [station_id])
-        times.append(time.perf_counter() - start)
-    print_stats("Schema 1 (Simple)", times)
-
-    # Schema 2
-    stmt = session.prepare("SELECT * FROM charging_events_hourly WHERE station_id = ? AND hour_bucket = ? LIMIT 100")
-    times = []
-    for _ in range(ITERATIONS):
-        start = time.perf_counter()
-        session.execute(stmt, [station_id, hour_bucket])
-        times.append(time.perf_counter() - start)
-    print_stats("Schema 2 (Hourly)", times)
-
-    # Schema 3
-    stmt = session.prepare("SELECT * FROM charging_sessions_daily WHERE station_id = ? AND day_bucket = ? LIMIT 100")
-    times = []
-    for _ in range(ITERATIONS):
-        start = time.perf_counter()
-        session.execute(stmt, [station_id, day_bucket])
-        times.append(time.perf_counter() - start)
-    print_stats("Schema 3 (Daily)", times)
+    group = "1. Query: Latest 100 records"
+    suite.add(group, "Schema 1 (Simple)", lambda: session.execute(latest_simple, [station_id]))
+    suite.add(group, "Schema 2 (Hourly)", lambda: session.execute(latest_hourly, [station_id, hour_bucket]))
+    # LIMIT 100 по всіх 24 bucket-ах дня: паралельне читання + злиття від найновіших
+    suite.add(group, "Schema 2 (Hourly - 24 parallel)",
+              lambda: fanout_read(session, latest_hourly_desc, [[station_id, b] for b in reversed(buckets_24h)],
+                                  limit=100, reverse=True))
+    suite.add(group, "Schema 3 (Daily)", lambda: session.execute(latest_daily, [station_id, day_bucket]))
 
     # -------------------------------------------------------------------------
     # QUERY 2: TIME RANGE (6 Hours)
     # -------------------------------------------------------------------------
-    print("\n--- 2. Query: Time Range (6 Hours) ---")
-    
+    group = "2. Query: Time Range (6 Hours)"
     # Schema 1 (Range query on partition)
-    stmt = session.prepare("SELECT * FROM charging_events_simple WHERE station_id = ? AND event_time >= ? AND event_time <= ?")
-    times = []
-    for _ in range(ITERATIONS):
-        start = time.perf_counter()
-        list(session.execute(stmt, [station_id, six_hours_ago, now]))
-        times.append(time.perf_counter() - start)
-    print_stats("Schema 1 (Simple)", times)
-
+    suite.add(group, "Schema 1 (Simple)", lambda: list(session.execute(range_simple, [station_id, six_hours_ago, now])))
     # Schema 2 (Multi-partition query simulation)
-    buckets_6h = [int((now - timedelta(hours=h)).strftime('%Y%m%d%H')) for h in range(6)]
-    stmt = session.prepare("SELECT * FROM charging_events_hourly WHERE station_id = ? AND hour_bucket = ?")
-    times = []
-    for _ in range(ITERATIONS):
-        start = time.perf_counter()
-        for b in buckets_6h:
-            list(session.execute(stmt, [station_id, b]))
-        times.append(time.perf_counter() - start)
-    print_stats("Schema 2 (Hourly - 6 requests)", times)
-
+    suite.add(group, "Schema 2 (Hourly - 6 requests)",
+              lambda: sequential_read(session, bucket_hourly, [[station_id, b] for b in buckets_6h]))
+    # Ті самі 6 bucket-ів одночасно (execute_async) зі злиттям за event_time
+    suite.add(group, "Schema 2 (Hourly - 6 parallel)",
+              lambda: fanout_read(session, bucket_hourly_asc, [[station_id, b] for b in buckets_6h]))
     # Schema 3 (Single partition range)
-    stmt = session.prepare("SELECT * FROM charging_sessions_daily WHERE station_id = ? AND day_bucket = ? AND event_time >= ? AND event_time <= ?")
-    times = []
-    for _ in range(ITERATIONS):
-        start = time.perf_counter()
-        list(session.execute(stmt, [station_id, day_bucket, six_hours_ago, now]))
-        times.append(time.perf_counter() - start)
-    print_stats("Schema 3 (Daily)", times)
+    suite.add(group, "Schema 3 (Daily)",
+              lambda: list(session.execute(range_daily, [station_id, day_bucket, six_hours_ago, now])))
 
     # -------------------------------------------------------------------------
     # QUERY 3: DAILY AGGREGATION (Full Day)
     # -------------------------------------------------------------------------
-    print("\n--- 3. Query: Daily Aggregation ---")
-
-    # Schema 1
-    stmt = session.prepare("SELECT * FROM charging_events_simple WHERE station_id = ? AND event_time >= ? AND event_time <= ?")
-    times = []
-    for _ in range(ITERATIONS):
-        start = time.perf_counter()
-        list(session.execute(stmt, [station_id, start_of_day, end_of_day]))
-        times.append(time.perf_counter() - start)
-    print_stats("Schema 1 (Simple)", times)
-
+    group = "3. Query: Daily Aggregation"
+    suite.add(group, "Schema 1 (Simple)",
+              lambda: list(session.execute(range_simple, [station_id, start_of_day, end_of_day])))
     # Schema 2 (24 requests!)
-    buckets_24h = [int((start_of_day + timedelta(hours=h)).strftime('%Y%m%d%H')) for h in range(24)]
-    stmt = session.prepare("SELECT * FROM charging_events_hourly WHERE station_id = ? AND hour_bucket = ?")
-    times = []
-    for _ in range(ITERATIONS):
-        start = time.perf_counter()
-        for b in buckets_24h:
-            list(session.execute(stmt, [station_id, b]))
-        times.append(time.perf_counter() - start)
-    print_stats("Schema 2 (Hourly - 24 requests)", times)
-
+    suite.add(group, "Schema 2 (Hourly - 24 requests)",
+              lambda: sequential_read(session, bucket_hourly, [[station_id, b] for b in buckets_24h]))
+    suite.add(group, "Schema 2 (Hourly - 24 parallel)",
+              lambda: fanout_read(session, bucket_hourly_asc, [[station_id, b] for b in buckets_24h]))
     # Schema 3 (1 partition)
-    stmt = session.prepare("SELECT * FROM charging_sessions_daily WHERE station_id = ? AND day_bucket = ?")
-    times = []
-    for _ in range(ITERATIONS):
-        start = time.perf_counter()
-        list(session.execute(stmt, [station_id, day_bucket]))
-        times.append(time.perf_counter() - start)
-    print_stats("Schema 3 (Daily)", times)
+    suite.add(group, "Schema 3 (Daily)", lambda: list(session.execute(bucket_daily, [station_id, day_bucket])))
+    # Агрегація на льоту посторінково, без утримання всього результату в пам'яті
+    suite.add(group, "Schema 1 (Simple - streamed agg)",
+              lambda: aggregate_power(stream_rows(session, range_simple, [station_id, start_of_day, end_of_day])))
+    suite.add(group, "Schema 3 (Daily - streamed agg)",
+              lambda: aggregate_power(stream_rows(session, bucket_daily, [station_id, day_bucket])))
+    # Готові агрегати: один рядок дня або 24 погодинні рядки з однієї партиції
+    suite.add(group, "Rollup (Daily - 1 row)",
+              lambda: session.execute(daily_rollup, [station_id, day_bucket]).one())
+    suite.add(group, "Rollup (Hourly - 1 partition)",
+              lambda: list(session.execute(hourly_rollup, [station_id, day_bucket])))
 
     # -------------------------------------------------------------------------
-    # QUERY 4: FILTERING (ALLOW FILTERING only)
+    # QUERY 3b: MONTH AGGREGATION (весь період симуляції)
     # -------------------------------------------------------------------------
-    print("\n--- 4. Query: Filtering (ALLOW FILTERING) ---")
+    group = "3b. Query: Month Aggregation"
+    suite.add(group, "Schema 1 (Simple - list)",
+              lambda: list(session.execute(range_simple, [station_id, month_start, month_end])), iterations=10)
+    suite.add(group, "Schema 1 (Simple - streamed agg)",
+              lambda: aggregate_power(stream_rows(session, range_simple, [station_id, month_start, month_end])),
+              iterations=10)
+    suite.add(group, "Rollup (Daily - 1 partition)",
+              lambda: list(session.execute(daily_rollup_range, [station_id, month_start.date(), month_end.date()])))
 
+    # -------------------------------------------------------------------------
+    # QUERY 4: FILTERING (ALLOW FILTERING only)
+    # -------------------------------------------------------------------------
     # Використовуємо Simple схему для найчеснішого тесту "поганої" практики
     # Шукаємо 'Type 2' конектори
-    
-    # query_string = f"SELECT * FROM charging_events_simple WHERE station_id = {station_id} AND connector_type = 'Type 2' ALLOW FILTERING"
     # Для prepared statement з ALLOW FILTERING треба бути обережним, 
     # тому використовуємо прямий рядок для простоти тесту антипатерну.
-    
     query = SimpleStatement(f"SELECT * FROM charging_events_simple WHERE station_id = {station_id.urn[9:]} AND connector_type = 'Type 2' ALLOW FILTERING")
-    
-    times = []
-    for _ in range(5):  # Зменшили кількість ітерацій
-        start = time.perf_counter()
-        list(session.execute(query))
-        times.append(time.perf_counter() - start)
-    print_stats("ALLOW FILTERING (Schema 1)", times)
+    suite.add("4. Query: Filtering (ALLOW FILTERING)", "ALLOW FILTERING (Schema 1)",
+              lambda: list(session.execute(query)), iterations=5, warmup=1)  # Зменшили кількість ітерацій
+
+    results = suite.run()
+    results_path = suite.export(results)
+    if COMPARE_WITH:
+        compare_results(results, COMPARE_WITH)
+    return results_path
 
 def main():
     cluster = Cluster(['127.0.0.1'])
@@ -0,0 +1,79 @@
+import random
+from datetime import timedelta
+from itertools import accumulate
+from cassandra.cluster import Cluster
+from bench_harness import BenchmarkSuite, compare_results
+from ev_data import KEYSPACE, START_DATE, DAYS_TO_SIMULATE, make_rng, make_station_ids, hour_bucket_of
+from query_cache import QueryCache, cached_hour_bucket, cached_latest
+
+# --- КОНФІГУРАЦІЯ ---
+REQUESTS = 5000            # Запитів у відтворенні
+ZIPF_S = 1.1               # Параметр Zipf: чим більший, тим сильніше запити зосереджені на кількох станціях
+HOT_HOURS = 24             # Запити йдуть до останніх HOT_HOURS годин симуляції
+LATEST_SHARE = 0.3         # Частка запитів «останні 100 записів»
+SEED = 7                   # Однакова послідовність запитів для обох варіантів
+COMPARE_WITH = None        # Шлях до JSON попереднього запуску (bench_results/...) для порівняння
+
+def zipf_weights(n, s=ZIPF_S):
+    """Кумулятивні ваги Zipf: станція рангу k запитується з імовірністю ~ 1/k^s"""
+    return list(accumulate(1 / (k ** s) for k in range(1, n + 1)))
+
+def access_pattern(station_ids, hour_buckets, seed=SEED):
+    """Нескінченна відтворювана послідовність запитів (тип, станція, bucket)"""
+    rng = random.Random(seed)
+    weights = zipf_weights(len(station_ids))
+    while True:
+        station = rng.choices(station_ids, cum_weights=weights)[0]
+        if rng.random() < LATEST_SHARE:
+            yield 'latest', station, None
+        else:
+            yield 'hourly', station, rng.choice(hour_buckets)
+
+def make_replay(session, latest_stmt, hourly_stmt, station_ids, hour_buckets, cache=None):
+    """Функція для харнесу: кожен виклик - наступний запит послідовності (з кешем або без)"""
+    requests = access_pattern(station_ids, hour_buckets)
+
+    def replay():
+        kind, station, bucket = next(requests)
+        if cache is None:
+            if kind == 'latest':
+                return list(session.execute(latest_stmt, [station]))
+            return list(session.execute(hourly_stmt, [station, bucket]))
+        if kind == 'latest':
+            return cached_latest(cache, session, latest_stmt, station)
+        return cached_hour_bucket(cache, session, hourly_stmt, station, bucket)
+
+    return replay
+
+def main():
+    cluster = Cluster(['127.0.0.1'])
+    session = cluster.connect(KEYSPACE)
+
+    # Ті самі UUID станцій, що й у генераторах (спільне зерно)
+    station_ids = make_station_ids(make_rng())
+    end = START_DATE + timedelta(days=DAYS_TO_SIMULATE)
+    hour_buckets = [hour_bucket_of(end - timedelta(hours=h + 1)) for h in range(HOT_HOURS)]
+
+    latest_stmt = session.prepare("SELECT * FROM charging_events_simple WHERE station_id = ? LIMIT 100")
+    hourly_stmt = session.prepare("SELECT * FROM charging_events_hourly WHERE station_id = ? AND hour_bucket = ?")
+
+    print(f"Відтворення {REQUESTS} запитів: Zipf(s={ZIPF_S}) по {len(station_ids)} станціях, "
+          f"{HOT_HOURS} год, {LATEST_SHARE:.0%} «latest 100»")
+
+    cache = QueryCache()
+    suite = BenchmarkSuite('benchmark_cache', iterations=REQUESTS, warmup=0)
+    group = "Zipf-доступ до станцій"
+    suite.add(group, "Без кешу", make_replay(session, latest_stmt, hourly_stmt, station_ids, hour_buckets))
+    suite.add(group, "З кешем (LRU + TTL)",
+              make_replay(session, latest_stmt, hourly_stmt, station_ids, hour_buckets, cache))
+
+    results = suite.run()
+    print(cache.report())
+
+    suite.export(results)
+    if COMPARE_WITH:
+        compare_results(results, COMPARE_WITH)
+    cluster.shutdown()
+
+if __name__ == "__main__":
+    main()
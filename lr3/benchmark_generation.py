@@ -0,0 +1,62 @@
+import time
+import random
+from itertools import islice
+import numpy as np
+from ev_data import (
+    NUM_STATIONS, READINGS_PER_HOUR,
+    get_power_value, power_values_block, make_rng, make_station_ids, generate_readings, generate_readings_np
+)
+
+# --- КОНФІГУРАЦІЯ ---
+N_VALUES = 1_000_000       # Значень потужності для мікробенчмарку get_power_value
+N_ROWS = 1_000_000         # Показників для бенчмарку повного потоку
+ROUNDS = 3                 # Повтори (беремо найкращий час)
+
+def best_time(fn, rounds=ROUNDS):
+    """Найкращий час із кількох запусків (с)"""
+    best = float('inf')
+    for _ in range(rounds):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def power_python():
+    rng = random.Random(1)
+    per_hour = N_VALUES // 24
+    for hour in range(24):
+        for _ in range(per_hour):
+            get_power_value(hour, rng)
+
+def power_numpy():
+    np_rng = np.random.default_rng(1)
+    per_hour = N_VALUES // 24
+    for hour in range(24):
+        power_values_block(hour, per_hour, np_rng)
+
+def readings_python():
+    rng = make_rng()
+    station_ids = make_station_ids(rng)
+    for _ in islice(generate_readings(rng, station_ids, days=10_000), N_ROWS):
+        pass
+
+def readings_numpy():
+    rng = make_rng()
+    station_ids = make_station_ids(rng)
+    for _ in islice(generate_readings_np(np.random.default_rng(1), station_ids, days=10_000), N_ROWS):
+        pass
+
+def main():
+    print(f"Мікробенчмарк генерації ({NUM_STATIONS} станцій, {READINGS_PER_HOUR} показників/год)")
+    print("=" * 70)
+    for name, fn, count in [
+        ("get_power_value (Python)", power_python, N_VALUES),
+        ("power_values_block (NumPy)", power_numpy, N_VALUES),
+        ("Потік показників (Python)", readings_python, N_ROWS),
+        ("Потік показників (NumPy)", readings_numpy, N_ROWS),
+    ]:
+        seconds = best_time(fn)
+        print(f" {name:<30} | {seconds:6.2f} с | {count / seconds:12,.0f} рядків/сек")
+
+if __name__ == "__main__":
+    main()
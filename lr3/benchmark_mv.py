@@ -1,24 +1,74 @@
-import time
-import statistics
+import uuid
 from cassandra.cluster import Cluster
 from cassandra.query import SimpleStatement
+from cassandra.concurrent import execute_concurrent
+from datetime import date, datetime, timedelta
+from bench_harness import BenchmarkSuite, compare_results
+from ev_data import INSERT_HOURLY
+from power_index import (
+    create_power_index_table, power_index_row, query_power_range, bands_for, SELECT_POWER_BAND, INSERT_POWER_INDEX
+)
 
 # --- КОНФІГУРАЦІЯ ---
 KEYSPACE = 'lab3_ev_network'
 ITERATIONS = 20  # Менше ітерацій, бо запит без MV повільний
+WARMUP = 2       # Прогрівальні запити перед вимірюванням
+COMPARE_WITH = None  # Шлях до JSON попереднього запуску (bench_results/...) для порівняння
+WRITE_ROWS = 500     # Вставок за одне вимірювання тесту запису
+WRITE_CONCURRENCY = 50
+# Окрема станція й bucket далеко в майбутньому, щоб тест запису не змішувався з даними симуляції
+WRITE_STATION = uuid.UUID('00000000-0000-4000-8000-00000000bec4')
+WRITE_HOUR = datetime(2099, 1, 1)
+WRITE_BUCKET = int(WRITE_HOUR.strftime('%Y%m%d%H'))
+WRITE_TABLE = 'charging_events_hourly_write_test'  # Копія схеми charging_events_hourly без MV
 
-def print_comparison(name, time_no_mv, time_with_mv):
-    avg_no_mv = statistics.mean(time_no_mv) * 1000
-    avg_with_mv = statistics.mean(time_with_mv) * 1000
-    
-    speedup = avg_no_mv / avg_with_mv if avg_with_mv > 0 else 0
+def print_comparison(name, results):
+    """Середній час кожного варіанта та прискорення відносно першого (базового)"""
+    baseline = results[0].histogram.mean() * 1000
     
     print(f"\nРЕЗУЛЬТАТИ: {name}")
-    print("-" * 50)
-    print(f"Без MV (ALLOW FILTERING): {avg_no_mv:8.2f} ms")
-    print(f"З MV (Direct Access):     {avg_with_mv:8.2f} ms")
-    print("-" * 50)
-    print(f"ПРИСКОРЕННЯ (Speedup):    {speedup:8.2f}x")
+    print("-" * 60)
+    for result in results:
+        if not result.histogram.count:
+            print(f"{result.name + ':':<28} Помилка або немає даних")
+            continue
+        avg = result.histogram.mean() * 1000
+        speedup = baseline / avg if avg > 0 else 0
+        print(f"{result.name + ':':<28} {avg:8.2f} ms | ПРИСКОРЕННЯ (Speedup): {speedup:6.2f}x")
+    print("-" * 60)
+
+def write_rows(count=WRITE_ROWS):
+    """Синтетичні показники тестової станції (той самий формат, що й у генераторах)"""
+    rows = []
+    for i in range(count):
+        event_time = WRITE_HOUR + timedelta(seconds=i % 3600)
+        power = round((i % 100) * 0.05, 2)
+        rows.append((WRITE_STATION, WRITE_BUCKET, event_time.date(), event_time, 'Type 2', power))
+    return rows
+
+def write_all(session, statements):
+    execute_concurrent(session, statements, concurrency=WRITE_CONCURRENCY, raise_on_first_error=True)
+
+def create_write_table(session):
+    """Тимчасова таблиця з тією самою схемою, що й charging_events_hourly, але без MV"""
+    table = session.cluster.metadata.keyspaces[KEYSPACE].tables['charging_events_hourly']
+    session.execute(table.as_cql_query().replace(
+        f"CREATE TABLE {KEYSPACE}.charging_events_hourly (",
+        f"CREATE TABLE IF NOT EXISTS {KEYSPACE}.{WRITE_TABLE} (", 1
+    ))
+
+def cleanup_write_test(session):
+    """Прибирає дані тесту запису: тимчасову таблицю та партиції тестової станції (MV оновлюються разом з базовою)"""
+    session.execute(f"DROP TABLE IF EXISTS {WRITE_TABLE}")
+    statements = [
+        (SimpleStatement("DELETE FROM charging_events_hourly WHERE station_id = %s AND hour_bucket = %s"),
+         (WRITE_STATION, WRITE_BUCKET)),
+    ]
+    delete_band = SimpleStatement(
+        "DELETE FROM events_by_power_band WHERE station_id = %s AND hour_bucket = %s AND power_band = %s"
+    )
+    statements += [(delete_band, (WRITE_STATION, WRITE_BUCKET, band)) for band in bands_for()]
+    write_all(session, statements)
 
 def run_mv_benchmark(session):
     print("Отримання тестових даних (Station ID)...")
@@ -33,10 +83,23 @@ def run_mv_benchmark(session):
     
     print(f"Тестуємо на Station: {st_id}, Bucket: {h_bucket}")
 
+    suite = BenchmarkSuite('benchmark_mv', iterations=ITERATIONS, warmup=WARMUP)
+
+    # Індекс смуг потужності (пишеться generate_data_all.py / generate_data_parallel.py)
+    create_power_index_table(session)
+    band_stmt = session.prepare(SELECT_POWER_BAND)
+
+    # Погодинний агрегат тієї ж години (station_hourly_rollup, рахується під час генерації)
+    day_bucket = date(h_bucket // 1000000, h_bucket // 10000 % 100, h_bucket // 100 % 100)
+    rollup_query = SimpleStatement(
+        f"SELECT high_power_count, low_power_count FROM station_hourly_rollup "
+        f"WHERE station_id={st_id.urn[9:]} AND day_bucket='{day_bucket}' AND hour_bucket={h_bucket}"
+    )
+
     # =========================================================================
     # ТЕСТ 1: High Power (> 2.5 kW)
     # =========================================================================
-    print("\nТест 1: Пошук записів з потужністю > 2.5 кВт")
+    group = "Тест 1: Пошук записів з потужністю > 2.5 кВт"
     
     # А. Повільний запит (Base Table)
     # Ми змушені читати все і фільтрувати на льоту
@@ -50,29 +113,17 @@ def run_mv_benchmark(session):
         f"SELECT * FROM events_high_power WHERE station_id={st_id.urn[9:]} AND hour_bucket={h_bucket} AND power_kw > 2.5"
     )
 
-    times_bad = []
-    times_good = []
-
-    print("   Running 'Bad' query...", end='', flush=True)
-    for _ in range(ITERATIONS):
-        start = time.perf_counter()
-        list(session.execute(query_bad))
-        times_bad.append(time.perf_counter() - start)
-    print(" Done.")
-
-    print("   Running 'Good' query...", end='', flush=True)
-    for _ in range(ITERATIONS):
-        start = time.perf_counter()
-        list(session.execute(query_good))
-        times_good.append(time.perf_counter() - start)
-    print(" Done.")
-    
-    print_comparison("High Power Query (> 2.5 kW)", times_bad, times_good)
+    suite.add(group, "Без MV (ALLOW FILTERING)", lambda q=query_bad: list(session.execute(q)))
+    suite.add(group, "З MV (Direct Access)", lambda q=query_good: list(session.execute(q)))
+    # В. Індекс смуг потужності: читаються лише смуги 2.5-5.0 кВт
+    suite.add(group, "Індекс смуг (power_band)",
+              lambda: query_power_range(session, band_stmt, st_id, h_bucket, low=2.5))
+    suite.add(group, "Rollup (лише кількість)", lambda: session.execute(rollup_query).one())
 
     # =========================================================================
     # ТЕСТ 2: Low Power (< 1.0 kW)
     # =========================================================================
-    print("\nТест 2: Пошук записів з потужністю < 1.0 кВт")
+    group = "Тест 2: Пошук записів з потужністю < 1.0 кВт"
     
     query_bad = SimpleStatement(
         f"SELECT * FROM charging_events_hourly WHERE station_id={st_id.urn[9:]} AND hour_bucket={h_bucket} AND power_kw < 1.0 ALLOW FILTERING"
@@ -82,24 +133,44 @@ def run_mv_benchmark(session):
         f"SELECT * FROM events_low_power WHERE station_id={st_id.urn[9:]} AND hour_bucket={h_bucket} AND power_kw < 1.0"
     )
 
-    times_bad = []
-    times_good = []
-
-    print("   Running 'Bad' query...", end='', flush=True)
-    for _ in range(ITERATIONS):
-        start = time.perf_counter()
-        list(session.execute(query_bad))
-        times_bad.append(time.perf_counter() - start)
-    print(" Done.")
-
-    print("   Running 'Good' query...", end='', flush=True)
-    for _ in range(ITERATIONS):
-        start = time.perf_counter()
-        list(session.execute(query_good))
-        times_good.append(time.perf_counter() - start)
-    print(" Done.")
-    
-    print_comparison("Low Power Query (< 1.0 kW)", times_bad, times_good)
+    suite.add(group, "Без MV (ALLOW FILTERING)", lambda q=query_bad: list(session.execute(q)))
+    suite.add(group, "З MV (Direct Access)", lambda q=query_good: list(session.execute(q)))
+    suite.add(group, "Індекс смуг (power_band)",
+              lambda: query_power_range(session, band_stmt, st_id, h_bucket, high=1.0))
+    suite.add(group, "Rollup (лише кількість)", lambda: session.execute(rollup_query).one())
+
+    # =========================================================================
+    # ТЕСТ 3: Вартість запису (write amplification)
+    # =========================================================================
+    # charging_events_hourly має два MV (кожна вставка оновлює ще й їх, з читанням перед записом).
+    # Усі варіанти пишуть ті самі рядки в ту саму схему: без MV - у її копію WRITE_TABLE,
+    # індекс смуг - та сама копія плюс одна додаткова звичайна вставка
+    group = f"Тест 3: Запис {WRITE_ROWS} показників"
+    rows = write_rows()
+    create_write_table(session)
+    insert_hourly = session.prepare(INSERT_HOURLY)
+    insert_plain = session.prepare(INSERT_HOURLY.replace('charging_events_hourly', WRITE_TABLE))
+    insert_index = session.prepare(INSERT_POWER_INDEX)
+    hourly_params = [(r[0], r[1], r[3], r[4], r[5], 0) for r in rows]
+    plain = [(insert_plain, params) for params in hourly_params]
+    with_mv = [(insert_hourly, params) for params in hourly_params]
+    with_index = plain + [(insert_index, power_index_row(r)) for r in rows]
+
+    suite.add(group, "Без MV (1 запис)", lambda: write_all(session, plain), iterations=10)
+    suite.add(group, "З MV (1 запис + 2 MV)", lambda: write_all(session, with_mv), iterations=10)
+    suite.add(group, "Індекс смуг (2 записи)", lambda: write_all(session, with_index), iterations=10)
+
+    try:
+        results = suite.run()
+    finally:
+        cleanup_write_test(session)
+    print_comparison("High Power Query (> 2.5 kW)", results[0:4])
+    print_comparison("Low Power Query (< 1.0 kW)", results[4:8])
+    print_comparison(f"Запис {WRITE_ROWS} показників (менше - краще, Speedup < 1 - дорожче)", results[8:11])
+
+    suite.export(results)
+    if COMPARE_WITH:
+        compare_results(results, COMPARE_WITH)
 
 def main():
     cluster = Cluster(['127.0.0.1'])
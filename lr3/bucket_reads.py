@@ -0,0 +1,93 @@
+import math
+import heapq
+from itertools import islice
+from operator import attrgetter
+
+# --- КОНФІГУРАЦІЯ ---
+CLUSTERING_KEY = 'event_time'  # Ключ кластеризації, за яким зливаються bucket-и
+FETCH_SIZE = 5000              # Рядків на сторінку для кожного bucket-а
+STREAM_FETCH_SIZE = 1000       # Рядків на сторінку при потоковому читанні великих діапазонів
+
+
+def fanout_read(session, stmt, params_list, limit=None, key=CLUSTERING_KEY, reverse=False, fetch_size=FETCH_SIZE):
+    """
+    Читає кілька партицій (наприклад, 24 погодинні bucket-и) одночасно:
+    усі запити відправляються через execute_async, а впорядковані в межах партиції
+    результати зливаються k-way злиттям в один потік за ключем кластеризації.
+    reverse має відповідати CLUSTERING ORDER таблиці (True для DESC).
+    limit обмежує кількість рядків у злитому потоці (LIMIT по всіх bucket-ах).
+    """
+    futures = []
+    for params in params_list:
+        bound = stmt.bind(params)
+        bound.fetch_size = fetch_size
+        futures.append(session.execute_async(bound))
+    # Наступні сторінки кожного bucket-а підвантажуються під час ітерації ResultSet
+    streams = [future.result() for future in futures]
+
+    merged = heapq.merge(*streams, key=attrgetter(key), reverse=reverse)
+    if limit is not None:
+        return list(islice(merged, limit))
+    return list(merged)
+
+
+def sequential_read(session, stmt, params_list, limit=None):
+    """Те саме послідовними session.execute (для порівняння в бенчмарку)"""
+    rows = []
+    for params in params_list:
+        rows.extend(session.execute(stmt, params))
+        if limit is not None and len(rows) >= limit:
+            return rows[:limit]
+    return rows
+
+
+def stream_rows(session, stmt, params, fetch_size=STREAM_FETCH_SIZE):
+    """
+    Ледачий потік рядків діапазонного запиту сторінками по fetch_size.
+    Запит наступної сторінки (за paging_state) відправляється одразу після отримання поточної,
+    тож мережа та база працюють, поки споживач обробляє рядки. В пам'яті - не більше двох сторінок.
+    """
+    bound = stmt.bind(params)
+    bound.fetch_size = fetch_size
+    future = session.execute_async(bound)
+    while future is not None:
+        page = future.result()
+        future = None
+        if page.paging_state is not None:
+            future = session.execute_async(bound, paging_state=page.paging_state)
+        yield from page.current_rows
+
+
+class PowerAggregate:
+    """Сума, середнє, мін/макс power_kw, що рахуються на льоту без збереження рядків"""
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def add(self, power):
+        self.count += 1
+        self.total += power
+        if power < self.min:
+            self.min = power
+        if power > self.max:
+            self.max = power
+
+    @property
+    def avg(self):
+        return self.total / self.count if self.count else 0.0
+
+    def as_dict(self):
+        if not self.count:
+            return {'count': 0, 'sum': 0.0, 'avg': 0.0, 'min': None, 'max': None}
+        return {'count': self.count, 'sum': self.total, 'avg': self.avg, 'min': self.min, 'max': self.max}
+
+
+def aggregate_power(rows):
+    """Агрегує потік рядків з полем power_kw (наприклад, з stream_rows)"""
+    aggregate = PowerAggregate()
+    for row in rows:
+        aggregate.add(row.power_kw)
+    return aggregate
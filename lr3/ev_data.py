@@ -0,0 +1,172 @@
+import uuid
+import random
+from itertools import repeat
+from datetime import datetime, timedelta
+import numpy as np
+
+# --- КОНФІГУРАЦІЯ ---
+KEYSPACE = 'lab3_ev_network'
+NUM_STATIONS = 50          # Кількість станцій
+DAYS_TO_SIMULATE = 30      # Кількість днів
+READINGS_PER_HOUR = 30     # Частота записів (наприклад, кожні 2 хвилини)
+SEED = 42                  # Зерно генератора: однакові станції та показники в усіх схемах
+START_DATE = datetime(2024, 1, 1)
+VECTORIZED = True          # True - генерація блоками NumPy, False - по рядку через random
+CONNECTOR_TYPES = ['Type 2', 'CCS 2', 'CHAdeMO', 'Tesla Supercharger']
+
+# Розрахунок очікуваної кількості
+EXPECTED_ROWS = NUM_STATIONS * DAYS_TO_SIMULATE * 24 * READINGS_PER_HOUR
+
+# Запити вставки для трьох схем
+INSERT_SIMPLE = """
+    INSERT INTO charging_events_simple
+    (station_id, event_time, connector_type, power_kw, session_duration)
+    VALUES (?, ?, ?, ?, ?)
+"""
+INSERT_HOURLY = """
+    INSERT INTO charging_events_hourly
+    (station_id, hour_bucket, event_time, connector_type, power_kw, session_duration)
+    VALUES (?, ?, ?, ?, ?, ?)
+"""
+INSERT_DAILY = """
+    INSERT INTO charging_sessions_daily
+    (station_id, day_bucket, event_time, connector_type, power_kw, session_duration)
+    VALUES (?, ?, ?, ?, ?, ?)
+"""
+
+def get_power_value(hour, rng=random):
+    """
+    Логіка генерації потужності відповідно до завдання:
+    - Денний пік (12:00–14:00): 3–5 кВт
+    - Ранок/вечір (6–9, 17–19): 1–3 кВт
+    - Ніч (21–5): 0–0.2 кВт
+    - Інший час: середнє значення (0.5-2 кВт)
+    """
+    val = 0.0
+    if 12 <= hour < 14:
+        val = rng.uniform(3.0, 5.0)
+    elif (6 <= hour < 9) or (17 <= hour < 19):
+        val = rng.uniform(1.0, 3.0)
+    elif (21 <= hour) or (hour < 5):
+        val = rng.uniform(0.0, 0.2)
+    else:
+        val = rng.uniform(0.5, 2.0)
+
+    # Імітація "Хмарності" (випадкові падіння на 30-70%)
+    # У контексті EV це може бути просідання напруги в мережі
+    if rng.random() < 0.2: # 20% шанс просідання
+        drop_factor = rng.uniform(0.3, 0.7)
+        val *= drop_factor
+
+    return round(val, 2)
+
+def make_rng(seed=SEED):
+    """Окремий генератор випадкових чисел, щоб запуски були відтворюваними"""
+    return random.Random(seed)
+
+def make_station_ids(rng, num_stations=NUM_STATIONS):
+    """UUID станцій з того ж зерна - однакові для всіх схем і запусків"""
+    return [uuid.UUID(int=rng.getrandbits(128), version=4) for _ in range(num_stations)]
+
+def hour_bucket_of(moment):
+    """bucket_hour у форматі YYYYMMDDHH"""
+    return ((moment.year * 100 + moment.month) * 100 + moment.day) * 100 + moment.hour
+
+def generate_readings(rng, station_ids, start_date=START_DATE, days=DAYS_TO_SIMULATE,
+                      readings_per_hour=READINGS_PER_HOUR):
+    """
+    Ліниво генерує кожен показник один раз:
+    (station_id, hour_bucket, day_bucket, event_time, connector_type, power_kw)
+    """
+    for day in range(days):
+        current_day = start_date + timedelta(days=day)
+        day_bucket = current_day.date()
+
+        for hour in range(24):
+            hour_bucket = hour_bucket_of(current_day.replace(hour=hour))
+
+            for _ in range(readings_per_hour):
+                # Випадкова хвилина/секунда всередині години
+                minute = rng.randint(0, 59)
+                second = rng.randint(0, 59)
+                event_time = current_day.replace(hour=hour, minute=minute, second=second)
+
+                for station in station_ids:
+                    power = get_power_value(hour, rng)
+                    conn = rng.choice(CONNECTOR_TYPES)
+                    yield (station, hour_bucket, day_bucket, event_time, conn, power)
+
+def power_band(hour):
+    """Діапазон потужності (min, max) для години - ті ж смуги, що й у get_power_value"""
+    if 12 <= hour < 14:
+        return 3.0, 5.0
+    if (6 <= hour < 9) or (17 <= hour < 19):
+        return 1.0, 3.0
+    if (21 <= hour) or (hour < 5):
+        return 0.0, 0.2
+    return 0.5, 2.0
+
+def power_values_block(hour, size, np_rng):
+    """Векторизований get_power_value: size значень для однієї години за кілька викликів NumPy"""
+    low, high = power_band(hour)
+    values = np_rng.uniform(low, high, size)
+    # 20% шанс просідання на 30-70%
+    drop = np_rng.random(size) < 0.2
+    values = np.where(drop, values * np_rng.uniform(0.3, 0.7, size), values)
+    return np.round(values, 2)
+
+def generate_readings_np(np_rng, station_ids, start_date=START_DATE, days=DAYS_TO_SIMULATE,
+                         readings_per_hour=READINGS_PER_HOUR):
+    """
+    Той самий потік показників, що й generate_readings, але кожна година генерується
+    одним блоком readings_per_hour x станції: потужність, конектори та час - масивами NumPy.
+    """
+    num_stations = len(station_ids)
+    block_size = readings_per_hour * num_stations
+    connectors = np.array(CONNECTOR_TYPES, dtype=object)
+
+    for day in range(days):
+        current_day = start_date + timedelta(days=day)
+        day_bucket = current_day.date()
+
+        for hour in range(24):
+            hour_start = current_day.replace(hour=hour)
+            hour_bucket = hour_bucket_of(hour_start)
+
+            # Випадкова секунда всередині години для кожного показника (спільна для станцій, як і раніше)
+            offsets = np_rng.integers(0, 3600, readings_per_hour).tolist()
+            event_times = [hour_start + timedelta(seconds=offset) for offset in offsets]
+
+            powers = power_values_block(hour, block_size, np_rng).tolist()
+            conns = connectors[np_rng.integers(0, len(CONNECTOR_TYPES), block_size)].tolist()
+
+            # Кортежі збираються zip-ом на рівні C, без індексації в циклі Python
+            yield from zip(
+                station_ids * readings_per_hour,
+                repeat(hour_bucket, block_size),
+                repeat(day_bucket, block_size),
+                [event_time for event_time in event_times for _ in range(num_stations)],
+                conns,
+                powers
+            )
+
+def stream_readings(seed=SEED, vectorized=VECTORIZED):
+    """UUID станцій та ледачий потік показників з одного зерна"""
+    rng = make_rng(seed)
+    station_ids = make_station_ids(rng)
+    if vectorized:
+        return station_ids, generate_readings_np(np.random.default_rng(seed), station_ids)
+    return station_ids, generate_readings(rng, station_ids)
+
+# Перетворення показника в параметри вставки (тривалість 0 - телеметрія миттєва)
+def simple_row(reading):
+    station, _, _, event_time, conn, power = reading
+    return (station, event_time, conn, power, 0)
+
+def hourly_row(reading):
+    station, hour_bucket, _, event_time, conn, power = reading
+    return (station, hour_bucket, event_time, conn, power, 0)
+
+def daily_row(reading):
+    station, _, day_bucket, event_time, conn, power = reading
+    return (station, day_bucket, event_time, conn, power, 0)
@@ -0,0 +1,219 @@
+import os
+import csv
+import time
+import heapq
+import pickle
+import tempfile
+from itertools import islice
+from ev_data import (
+    KEYSPACE, EXPECTED_ROWS, INSERT_SIMPLE, INSERT_HOURLY, INSERT_DAILY,
+    stream_readings, simple_row, hourly_row, daily_row
+)
+
+# --- КОНФІГУРАЦІЯ ---
+EXPORT_DIR = 'bulk_export'          # Куди складати CSV для cqlsh COPY FROM
+TABLES = ['simple', 'hourly', 'daily']
+WRITE_BUFFER = 8 * 1024 * 1024      # Буфер запису файлу (байт): рідкі великі write() замість дрібних
+SPILL_ROWS = 2_000_000              # Рядків у пам'яті, після яких відсортований прогін скидається на диск
+COMPARE_ONLINE = True               # Порівняти зі швидкістю онлайн-вставки (якщо є Cassandra)
+ONLINE_SAMPLE = 100_000             # Рядків для заміру онлайн-шляху (результат екстраполюється)
+
+# Таблиця -> (назва, запит вставки, перетворення показника, кількість колонок ключа партиції)
+# Ключ кластеризації в усіх схемах - event_time (наступна колонка після ключа партиції)
+SCHEMAS = {
+    'simple': ('charging_events_simple', INSERT_SIMPLE, simple_row, 1),
+    'hourly': ('charging_events_hourly', INSERT_HOURLY, hourly_row, 2),
+    'daily': ('charging_sessions_daily', INSERT_DAILY, daily_row, 2),
+}
+
+def insert_columns(insert):
+    """Список колонок із тексту INSERT (... (col1, col2, ...) VALUES ...)"""
+    columns = insert[insert.index('(') + 1:insert.index(')')]
+    return [c.strip() for c in columns.split(',')]
+
+def read_run(run):
+    """Рядки тимчасового прогону в тому порядку, в якому їх записав spill()"""
+    while True:
+        try:
+            yield pickle.load(run)
+        except EOFError:
+            return
+
+def tagged(rows, source, size):
+    """(primary key, номер джерела) -> рядок: при однакових ключах пізніше джерело йде останнім"""
+    for row in rows:
+        yield (row[:size], source), row
+
+class PartitionSortedWriter:
+    """
+    Пише рядки в CSV згрупованими по партиціях: за значенням ключа партиції,
+    а всередині партиції - за event_time. Це порядок значень Python, а не токенів Murmur3,
+    тож файл - вхід для COPY FROM, а не готові до sstableloader дані.
+    Пам'ять обмежена: кожні spill_rows рядків буфер відсортованим прогоном іде в тимчасовий файл,
+    а flush() зливає прогони з буфером через heapq.merge (зовнішнє сортування).
+    Рядки з однаковим primary key перезаписуються, як і при вставці в Cassandra (виграє пізніший).
+    """
+
+    def __init__(self, path, columns, partition_size, spill_rows=SPILL_ROWS):
+        self.file = open(path, 'w', newline='', buffering=WRITE_BUFFER)
+        self.writer = csv.writer(self.file)
+        self.writer.writerow(columns)
+        self.partition_size = partition_size
+        self.spill_rows = spill_rows
+        self.partitions = {}
+        self.buffered = 0
+        self.runs = []   # Тимчасові файли з відсортованими прогонами
+        self.rows = 0
+        self._timestamps = {}  # event_time -> рядок (спільний для всіх станцій, strftime дорогий)
+
+    def format_time(self, event_time):
+        """timestamp у форматі, який розуміє cqlsh COPY FROM (UTC)"""
+        text = self._timestamps.get(event_time)
+        if text is None:
+            if len(self._timestamps) > 100_000:
+                self._timestamps.clear()
+            text = self._timestamps[event_time] = event_time.strftime('%Y-%m-%d %H:%M:%S+0000')
+        return text
+
+    def add(self, row):
+        partition = self.partitions.setdefault(row[:self.partition_size], {})
+        event_time = row[self.partition_size]
+        if event_time not in partition:
+            self.buffered += 1
+        partition[event_time] = row
+        if self.buffered >= self.spill_rows:
+            self.spill()
+
+    def sorted_buffer(self):
+        for key in sorted(self.partitions):
+            partition = self.partitions[key]
+            for event_time in sorted(partition):
+                yield partition[event_time]
+
+    def spill(self):
+        """Скидає буфер відсортованим прогоном у тимчасовий файл"""
+        run = tempfile.TemporaryFile()
+        for row in self.sorted_buffer():
+            pickle.dump(row, run, pickle.HIGHEST_PROTOCOL)
+        run.seek(0)
+        self.runs.append(run)
+        self.partitions = {}
+        self.buffered = 0
+
+    def merged_rows(self):
+        """Прогони та буфер, злиті в один відсортований потік без дублікатів primary key"""
+        size = self.partition_size + 1  # Ключ партиції + event_time
+        sources = [read_run(run) for run in self.runs] + [self.sorted_buffer()]
+        previous = None
+        for (primary_key, _), row in heapq.merge(*(tagged(rows, n, size) for n, rows in enumerate(sources))):
+            if previous is not None and previous[:size] != primary_key:
+                yield previous
+            previous = row
+        if previous is not None:
+            yield previous
+
+    def flush(self):
+        """Записує всі накопичені партиції (викликаємо, коли вони гарантовано завершені)"""
+        i = self.partition_size  # Позиція event_time у рядку
+        for row in self.merged_rows():
+            self.writer.writerow(row[:i] + (self.format_time(row[i]),) + row[i + 1:])
+            self.rows += 1
+        for run in self.runs:
+            run.close()
+        self.runs = []
+        self.partitions = {}
+        self.buffered = 0
+
+    def close(self):
+        self.flush()
+        self.file.close()
+
+def export(tables=TABLES, export_dir=EXPORT_DIR):
+    """
+    Генерує той самий потік показників, що й онлайн-генератори, і пише по CSV на таблицю.
+    Погодинні та денні партиції завершуються разом із днем, тож їх скидаємо щодня;
+    партиції Simple (лише station_id) охоплюють увесь період і зливаються з прогонів у кінці.
+    Повертає {таблиця: (шлях, кількість рядків)}.
+    """
+    os.makedirs(export_dir, exist_ok=True)
+    writers = {}
+    for name in tables:
+        table, insert, to_row, partition_size = SCHEMAS[name]
+        path = os.path.join(export_dir, f"{table}.csv")
+        writers[name] = (PartitionSortedWriter(path, insert_columns(insert), partition_size), to_row, path)
+
+    _, readings = stream_readings()
+    current_day = None
+    for reading in readings:
+        day_bucket = reading[2]
+        if day_bucket != current_day:
+            for name in ('hourly', 'daily'):
+                if name in writers:
+                    writers[name][0].flush()
+            current_day = day_bucket
+        for writer, to_row, _ in writers.values():
+            writer.add(to_row(reading))
+
+    result = {}
+    for name, (writer, _, path) in writers.items():
+        writer.close()
+        result[SCHEMAS[name][0]] = (path, writer.rows)
+    return result
+
+def measure_online(sample=ONLINE_SAMPLE):
+    """Швидкість онлайн-вставки на вибірці (рядків/сек) або None, якщо Cassandra недоступна"""
+    try:
+        from cassandra.cluster import Cluster
+        from pipeline import write_stream
+    except ImportError:
+        print("cassandra-driver не встановлено - порівняння з онлайн-шляхом пропущено")
+        return None
+
+    try:
+        cluster = Cluster(['127.0.0.1'])
+        session = cluster.connect(KEYSPACE)
+    except Exception as e:
+        print(f"Cassandra недоступна ({e}) - порівняння з онлайн-шляхом пропущено")
+        return None
+
+    insert_stmt = session.prepare(INSERT_HOURLY)
+    _, readings = stream_readings()
+    start = time.time()
+    written = write_stream(session, insert_stmt, (hourly_row(r) for r in islice(readings, sample)),
+                           progress_every=0)
+    elapsed = time.time() - start
+    cluster.shutdown()
+    return written / elapsed
+
+def main():
+    print(f"План експорту: {EXPECTED_ROWS:,} показників x {len(TABLES)} схем у '{EXPORT_DIR}/' (офлайн)")
+
+    start = time.time()
+    result = export()
+    total_time = time.time() - start
+    total_rows = sum(rows for _, rows in result.values())
+
+    print("\n" + "="*40)
+    print("ЗАВЕРШЕНО!")
+    for table, (path, rows) in result.items():
+        size_mb = os.path.getsize(path) / 1024 / 1024
+        print(f"{table:<26} | {rows:>10,} рядків | {size_mb:8.1f} МБ | {path}")
+    print(f"Час генерації та експорту: {total_time:.2f} с ({total_time/60:.2f} хв)")
+    print(f"Швидкість: {total_rows/total_time:.0f} рядків/сек")
+
+    if COMPARE_ONLINE:
+        online_rate = measure_online()
+        if online_rate:
+            print(f"Онлайн-вставка (вибірка {ONLINE_SAMPLE:,}): {online_rate:.0f} рядків/сек "
+                  f"-> ті самі {total_rows:,} рядків зайняли б ~{total_rows/online_rate:.0f} с "
+                  f"(x{(total_rows/total_time)/online_rate:.1f} повільніше)")
+    print("="*40)
+
+    print("\nЗавантаження в кластер:")
+    for table, (path, _) in result.items():
+        name = next(n for n, s in SCHEMAS.items() if s[0] == table)
+        columns = ', '.join(insert_columns(SCHEMAS[name][1]))
+        print(f"  COPY {KEYSPACE}.{table} ({columns}) FROM '{path}' WITH HEADER = TRUE;")
+
+if __name__ == "__main__":
+    main()
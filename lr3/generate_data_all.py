@@ -0,0 +1,82 @@
+import time
+from cassandra.cluster import Cluster
+from pipeline import write_statement_stream, AdaptiveConcurrency
+from rollups import IngestRollups, create_rollup_tables, INSERT_HOURLY_ROLLUP, INSERT_DAILY_ROLLUP
+from power_index import create_power_index_table, power_index_row, INSERT_POWER_INDEX
+from ev_data import (
+    KEYSPACE, EXPECTED_ROWS, INSERT_SIMPLE, INSERT_HOURLY, INSERT_DAILY,
+    stream_readings, simple_row, hourly_row, daily_row
+)
+
+# --- КОНФІГУРАЦІЯ ---
+BATCH_SIZE = 3000          # Запитів в одному чанку (по 3 на показник)
+CONCURRENCY = 300          # Стартова паралельність (спільна для трьох таблиць, далі підлаштовується)
+ROLLUPS = True             # Рахувати погодинні/денні агрегати станцій під час запису
+POWER_INDEX = True         # Писати індекс смуг потужності (альтернатива MV events_*_power)
+
+def fan_out(readings, insert_simple, insert_hourly, insert_daily, rollups=None, insert_index=None):
+    """
+    Кожен показник генерується один раз і записується в усі три схеми
+    (+ індекс смуг потужності та агрегати завершених днів)
+    """
+    for reading in readings:
+        if rollups is not None:
+            yield from rollups.add(reading)
+        yield insert_simple, simple_row(reading)
+        yield insert_hourly, hourly_row(reading)
+        yield insert_daily, daily_row(reading)
+        if insert_index is not None:
+            yield insert_index, power_index_row(reading)
+    if rollups is not None:
+        yield from rollups.flush()
+
+def main():
+    print(f"План генерації: {EXPECTED_ROWS:,} показників x 3 схеми = {EXPECTED_ROWS * 3:,} рядків.")
+
+    cluster = Cluster(['127.0.0.1'])
+    session = cluster.connect()
+
+    session.execute(f"""
+        CREATE KEYSPACE IF NOT EXISTS {KEYSPACE}
+        WITH REPLICATION = {{ 'class' : 'SimpleStrategy', 'replication_factor' : 1 }};
+    """)
+    session.set_keyspace(KEYSPACE)
+
+    insert_simple = session.prepare(INSERT_SIMPLE)
+    insert_hourly = session.prepare(INSERT_HOURLY)
+    insert_daily = session.prepare(INSERT_DAILY)
+
+    rollups = None
+    if ROLLUPS:
+        create_rollup_tables(session)
+        rollups = IngestRollups(session.prepare(INSERT_HOURLY_ROLLUP), session.prepare(INSERT_DAILY_ROLLUP))
+
+    insert_index = None
+    if POWER_INDEX:
+        create_power_index_table(session)
+        insert_index = session.prepare(INSERT_POWER_INDEX)
+
+    # Одне зерно -> ті самі станції та показники, що й в окремих генераторах
+    station_ids, readings = stream_readings()
+
+    print("Початок потокової генерації та запису в charging_events_simple, charging_events_hourly, charging_sessions_daily...")
+    controller = AdaptiveConcurrency(concurrency=CONCURRENCY)
+    start_db_time = time.time()
+
+    total_records = write_statement_stream(
+        session, fan_out(readings, insert_simple, insert_hourly, insert_daily, rollups, insert_index),
+        chunk_size=BATCH_SIZE, controller=controller
+    )
+
+    total_time = time.time() - start_db_time
+    print("\n" + "="*40)
+    print("ЗАВЕРШЕНО!")
+    print(f"Всього записів: {total_records} ({EXPECTED_ROWS} на схему + індекс і агрегати), невдалих: {controller.failed}")
+    print(f"Час генерації та запису в БД: {total_time:.2f} с ({total_time/60:.2f} хв)")
+    print(f"Швидкість: {total_records/total_time:.0f} записів/сек")
+    print(controller.report())
+    print("="*40)
+    cluster.shutdown()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+import time
+import queue
+import multiprocessing as mp
+from cassandra.cluster import Cluster, ExecutionProfile, EXEC_PROFILE_DEFAULT
+from cassandra.policies import TokenAwarePolicy, DCAwareRoundRobinPolicy
+from pipeline import write_statement_stream, AdaptiveConcurrency
+from rollups import IngestRollups, create_rollup_tables, INSERT_HOURLY_ROLLUP, INSERT_DAILY_ROLLUP
+from power_index import create_power_index_table, power_index_row, INSERT_POWER_INDEX
+from ev_data import (
+    KEYSPACE, EXPECTED_ROWS, INSERT_SIMPLE, INSERT_HOURLY, INSERT_DAILY,
+    stream_readings, simple_row, hourly_row, daily_row
+)
+
+# --- КОНФІГУРАЦІЯ ---
+CASSANDRA_HOSTS = ['127.0.0.1']
+NUM_WORKERS = 4            # Кількість процесів-завантажувачів (~ кількість ядер машини)
+WORKER_CONCURRENCY = 100   # Стартова паралельність у кожному процесі (далі підлаштовується)
+BATCH_SIZE = 3000          # Запитів в одному чанку
+TABLES = ['simple', 'hourly', 'daily', 'power_index']  # Які схеми заповнювати
+ROLLUPS = True             # Агрегати станцій (шард воркера містить усі показники своїх станцій)
+REPORT_POLL = 5.0          # Як часто (с) перевіряти, чи живі воркери, поки чекаємо на звіти
+
+# Схема -> (запит вставки, перетворення показника в параметри)
+SCHEMAS = {
+    'simple': (INSERT_SIMPLE, simple_row),
+    'hourly': (INSERT_HOURLY, hourly_row),
+    'daily': (INSERT_DAILY, daily_row),
+    'power_index': (INSERT_POWER_INDEX, power_index_row),  # Індекс смуг потужності замість MV
+}
+
+def connect():
+    """Окремий Cluster на процес: token-aware маршрутизація одразу на вузол-власник партиції"""
+    profile = ExecutionProfile(load_balancing_policy=TokenAwarePolicy(DCAwareRoundRobinPolicy()))
+    cluster = Cluster(CASSANDRA_HOSTS, execution_profiles={EXEC_PROFILE_DEFAULT: profile})
+    return cluster, cluster.connect(KEYSPACE)
+
+def shard_statements(readings, shard, statements, rollups=None):
+    """Лише показники станцій свого шарду, кожен - в усі вибрані схеми (+ агрегати завершених днів)"""
+    for reading in readings:
+        if reading[0] in shard:
+            if rollups is not None:
+                yield from rollups.add(reading)
+            for stmt, to_row in statements:
+                yield stmt, to_row(reading)
+    if rollups is not None:
+        yield from rollups.flush()
+
+def run_worker(worker_id, reports):
+    """Воркер: свій шард станцій, своя сесія та власний ліміт паралельності"""
+    controller = AdaptiveConcurrency(concurrency=WORKER_CONCURRENCY)
+    shard = set()
+    cluster = None
+    start = time.time()
+    error = None
+    # Звіт надсилається за будь-якої помилки (і під час підключення чи prepare),
+    # інакше батьківський процес чекав би на нього вічно
+    try:
+        cluster, session = connect()
+        statements = [(session.prepare(SCHEMAS[name][0]), SCHEMAS[name][1]) for name in TABLES]
+        rollups = None
+        if ROLLUPS:
+            rollups = IngestRollups(session.prepare(INSERT_HOURLY_ROLLUP), session.prepare(INSERT_DAILY_ROLLUP))
+
+        # Потік генерується з того ж зерна, що й в інших генераторах, тому шарди
+        # разом дають ті самі рядки; воркер бере кожну NUM_WORKERS-ту станцію
+        station_ids, readings = stream_readings()
+        shard = set(station_ids[worker_id::NUM_WORKERS])
+
+        write_statement_stream(
+            session, shard_statements(readings, shard, statements, rollups),
+            chunk_size=BATCH_SIZE, controller=controller, progress_every=0
+        )
+    except Exception as e:
+        error = str(e)
+    finally:
+        if cluster is not None:
+            cluster.shutdown()
+    # У чергу - лише прості значення (винятки драйвера не завжди серіалізуються)
+    reports.put((worker_id, len(shard), controller.succeeded, controller.failed, controller.retried,
+                 controller.concurrency, time.time() - start, error))
+
+def collect_reports(workers, reports):
+    """
+    Звіти всіх воркерів. Якщо процес завершився, не надіславши звіт (наприклад, вбитий OOM),
+    замість нього повертається звіт з помилкою, а не вічне очікування на черзі.
+    """
+    results = {}
+    while len(results) < len(workers):
+        try:
+            report = reports.get(timeout=REPORT_POLL)
+            results[report[0]] = report
+        except queue.Empty:
+            for worker_id, w in enumerate(workers):
+                if worker_id not in results and not w.is_alive() and reports.empty():
+                    results[worker_id] = (worker_id, 0, 0, 0, 0, 0, 0.0,
+                                          f"процес завершився без звіту (exitcode {w.exitcode})")
+    return list(results.values())
+
+def main():
+    total_planned = EXPECTED_ROWS * len(TABLES)
+    print(f"План генерації: {EXPECTED_ROWS:,} показників x {len(TABLES)} схем = {total_planned:,} рядків.")
+    print(f"Воркерів: {NUM_WORKERS}, паралельних запитів у кожному: {WORKER_CONCURRENCY}")
+
+    # Keyspace створюємо в батьківському процесі й закриваємо з'єднання до старту воркерів
+    cluster = Cluster(CASSANDRA_HOSTS)
+    session = cluster.connect()
+    session.execute(f"""
+        CREATE KEYSPACE IF NOT EXISTS {KEYSPACE}
+        WITH REPLICATION = {{ 'class' : 'SimpleStrategy', 'replication_factor' : 1 }};
+    """)
+    session.set_keyspace(KEYSPACE)
+    if 'power_index' in TABLES:
+        create_power_index_table(session)
+    if ROLLUPS:
+        create_rollup_tables(session)
+    cluster.shutdown()
+
+    reports = mp.Queue()
+    workers = [mp.Process(target=run_worker, args=(i, reports)) for i in range(NUM_WORKERS)]
+
+    print("Початок паралельної генерації та запису в Cassandra...")
+    start_db_time = time.time()
+    for w in workers:
+        w.start()
+
+    results = collect_reports(workers, reports)
+    for w in workers:
+        w.join()
+    total_time = time.time() - start_db_time
+
+    print("\n" + "="*88)
+    print(f"{'Воркер':>6} | {'Станцій':>7} | {'Записів':>12} | {'Час, с':>8} | {'Записів/сек':>12} | "
+          f"{'Помилок':>7} | {'Повторів':>8} | {'Паралельн.':>10}")
+    print("-"*88)
+    total_records = 0
+    total_failed = 0
+    for worker_id, stations, written, failed, retried, concurrency, seconds, error in sorted(results):
+        total_records += written
+        total_failed += failed
+        print(f"{worker_id:>6} | {stations:>7} | {written:>12,} | {seconds:8.2f} | {(written/seconds if seconds else 0):>12,.0f} | "
+              f"{failed:>7} | {retried:>8} | {concurrency:>10}")
+        if error:
+            print(f"{'':>6} | Помилка: {error}")
+
+    print("="*88)
+    print("ЗАВЕРШЕНО!")
+    print(f"Всього записів: {total_records}")
+    print(f"Час генерації та запису в БД: {total_time:.2f} с ({total_time/60:.2f} хв)")
+    print(f"Швидкість: {total_records/total_time:.0f} записів/сек (сумарно по {NUM_WORKERS} процесах)")
+    print(f"Невдалих записів: {total_failed}")
+    print("="*88)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,187 @@
+import time
+import queue
+import threading
+from cassandra import OperationTimedOut, WriteTimeout, Unavailable
+from cassandra.protocol import OverloadedErrorMessage
+from cassandra.concurrent import execute_concurrent, execute_concurrent_with_args
+
+# --- КОНФІГУРАЦІЯ ---
+CHUNK_SIZE = 1000          # Рядків в одному чанку, що передається в драйвер
+QUEUE_DEPTH = 8            # Максимум готових чанків у черзі (обмежує пам'ять)
+CONCURRENCY = 100          # Паралельних запитів до бази
+PROGRESS_EVERY = 50000     # Як часто виводити прогрес (рядків)
+
+# Адаптивна паралельність (AIMD)
+MIN_CONCURRENCY = 8        # Нижня межа паралельних запитів
+MAX_CONCURRENCY = 1024     # Верхня межа паралельних запитів
+TARGET_LATENCY = 0.05      # Цільова затримка запиту (с); вище - зменшуємо паралельність
+ADDITIVE_STEP = 8          # На скільки збільшуємо паралельність після вдалого чанку
+DECREASE_FACTOR = 0.5      # У скільки разів зменшуємо при перевантаженні
+MAX_RETRIES = 5            # Повтори невдалих запитів
+RETRY_BACKOFF = 0.2        # Базова пауза між повторами (с), подвоюється з кожною спробою
+
+# Помилки, що означають перевантаження кластера (сигнал зменшити паралельність)
+OVERLOAD_ERRORS = (OperationTimedOut, WriteTimeout, Unavailable, OverloadedErrorMessage)
+
+_DONE = object()  # Маркер кінця потоку
+
+
+def iter_chunks(rows, size=CHUNK_SIZE):
+    """Ріже будь-який ітератор рядків на списки по size елементів"""
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _produce(rows, chunk_size, chunks):
+    """Потік-генератор: кладе чанки в обмежену чергу (блокується, коли вона повна)"""
+    try:
+        for chunk in iter_chunks(rows, chunk_size):
+            chunks.put(chunk)
+    except Exception as e:  # Передаємо помилку генерації в основний потік
+        chunks.put(e)
+    finally:
+        chunks.put(_DONE)
+
+
+def _write_chunks(rows, write_chunk, chunk_size, queue_depth, progress_every):
+    """
+    Генерація йде в окремому потоці й накопичує не більше queue_depth чанків,
+    поки основний потік пише попередні в Cassandra через write_chunk(chunk),
+    який повертає кількість успішно записаних рядків чанку.
+    Пам'ять не залежить від загальної кількості рядків.
+    """
+    chunks = queue.Queue(maxsize=queue_depth)
+    producer = threading.Thread(target=_produce, args=(rows, chunk_size, chunks), daemon=True)
+    producer.start()
+
+    written = 0
+    next_progress = progress_every
+    while True:
+        chunk = chunks.get()
+        if chunk is _DONE:
+            break
+        if isinstance(chunk, Exception):
+            raise chunk
+
+        written += write_chunk(chunk)
+
+        if progress_every and written >= next_progress:
+            print(f"   Записано {written:,} рядків...")
+            next_progress += progress_every
+
+    producer.join()
+    return written
+
+
+class AdaptiveConcurrency:
+    """
+    Запис чанків з паралельністю, що підлаштовується під кластер (AIMD):
+    після чанку без помилок і з затримкою нижче цільової паралельність росте на ADDITIVE_STEP,
+    при тайм-аутах/перевантаженні або повільних відповідях - множиться на DECREASE_FACTOR.
+    Невдалі запити повторюються з експоненційною паузою, результати рахуються в лічильниках.
+    """
+
+    def __init__(self, concurrency=CONCURRENCY, min_concurrency=MIN_CONCURRENCY, max_concurrency=MAX_CONCURRENCY,
+                 target_latency=TARGET_LATENCY, max_retries=MAX_RETRIES):
+        self.concurrency = concurrency
+        self.min_concurrency = min_concurrency
+        self.max_concurrency = max_concurrency
+        self.target_latency = target_latency
+        self.max_retries = max_retries
+        self.succeeded = 0   # Успішних запитів
+        self.failed = 0      # Запитів, що не пройшли і після всіх повторів
+        self.retried = 0     # Повторних спроб
+        self.overloads = 0   # Помилок перевантаження (тайм-аути, Unavailable, Overloaded)
+        self.peak = concurrency
+        self.last_error = None
+
+    def _adjust(self, elapsed, size, overloaded):
+        """AIMD: оцінюємо затримку запиту як час чанку / кількість «хвиль» паралельних запитів"""
+        waves = max(1, -(-size // self.concurrency))
+        latency = elapsed / waves
+        if overloaded or latency > self.target_latency:
+            self.concurrency = max(self.min_concurrency, int(self.concurrency * DECREASE_FACTOR))
+        else:
+            self.concurrency = min(self.max_concurrency, self.concurrency + ADDITIVE_STEP)
+            self.peak = max(self.peak, self.concurrency)
+
+    def write(self, session, statements_and_params):
+        """Записує список пар (statement, params); повертає кількість успішних запитів"""
+        pending = statements_and_params
+        written = 0
+        for attempt in range(self.max_retries + 1):
+            start = time.perf_counter()
+            results = execute_concurrent(session, pending, concurrency=self.concurrency, raise_on_first_error=False)
+
+            failed = []
+            overloaded = False
+            for item, (success, result) in zip(pending, results):
+                if success:
+                    written += 1
+                    continue
+                failed.append(item)
+                self.last_error = result
+                if isinstance(result, OVERLOAD_ERRORS):
+                    overloaded = True
+                    self.overloads += 1
+
+            self._adjust(time.perf_counter() - start, len(pending), overloaded)
+            if not failed:
+                break
+            if attempt == self.max_retries:
+                self.failed += len(failed)
+                break
+
+            # Вставки ідемпотентні, тому повторюємо лише невдалі запити
+            self.retried += len(failed)
+            pending = failed
+            time.sleep(RETRY_BACKOFF * (2 ** attempt))
+
+        self.succeeded += written
+        return written
+
+    def report(self):
+        """Підсумок для виводу після завантаження"""
+        text = (f"Успішно: {self.succeeded} | Помилок: {self.failed} | Повторів: {self.retried} | "
+                f"Перевантажень: {self.overloads} | Паралельність: {self.concurrency} (пік {self.peak})")
+        if self.failed:
+            text += f"\nОстання помилка: {self.last_error}"
+        return text
+
+
+def write_stream(session, stmt, rows, chunk_size=CHUNK_SIZE, concurrency=CONCURRENCY,
+                 queue_depth=QUEUE_DEPTH, progress_every=PROGRESS_EVERY, controller=None):
+    """
+    Записує ледачий потік параметрів для одного prepared statement.
+    З controller (AdaptiveConcurrency) паралельність підлаштовується, а невдалі запити повторюються.
+    Повертає кількість успішно записаних рядків (невдалі - у controller.failed).
+    """
+    def write_chunk(chunk):
+        if controller is not None:
+            return controller.write(session, [(stmt, params) for params in chunk])
+        # Без controller перша ж помилка перериває запис винятком, тож записано весь чанк
+        execute_concurrent_with_args(session, stmt, chunk, concurrency=concurrency)
+        return len(chunk)
+
+    return _write_chunks(rows, write_chunk, chunk_size, queue_depth, progress_every)
+
+
+def write_statement_stream(session, statements_and_params, chunk_size=CHUNK_SIZE, concurrency=CONCURRENCY,
+                           queue_depth=QUEUE_DEPTH, progress_every=PROGRESS_EVERY, controller=None):
+    """
+    Те саме для потоку пар (statement, params) - наприклад, коли один показник
+    записується в кілька таблиць. Повертає кількість успішних запитів.
+    """
+    def write_chunk(chunk):
+        if controller is not None:
+            return controller.write(session, chunk)
+        execute_concurrent(session, chunk, concurrency=concurrency)
+        return len(chunk)
+
+    return _write_chunks(statements_and_params, write_chunk, chunk_size, queue_depth, progress_every)
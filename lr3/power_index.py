@@ -0,0 +1,65 @@
+import math
+from bucket_reads import fanout_read
+
+# --- КОНФІГУРАЦІЯ ---
+BAND_WIDTH_KW = 0.5        # Ширина смуги потужності: 0-0.5, 0.5-1.0, ... кВт
+MAX_POWER_KW = 5.0         # Верхня межа потужності в даних (get_power_value)
+
+# Індекс, який підтримує застосунок: показник години лежить у партиції своєї смуги,
+# а всередині смуги відсортований за power_kw - діапазон читається без фільтрації
+CREATE_POWER_INDEX = """
+    CREATE TABLE IF NOT EXISTS events_by_power_band (
+        station_id uuid,
+        hour_bucket int,
+        power_band int,
+        power_kw double,
+        event_time timestamp,
+        connector_type text,
+        PRIMARY KEY ((station_id, hour_bucket, power_band), power_kw, event_time)
+    )
+"""
+INSERT_POWER_INDEX = """
+    INSERT INTO events_by_power_band
+    (station_id, hour_bucket, power_band, power_kw, event_time, connector_type)
+    VALUES (?, ?, ?, ?, ?, ?)
+"""
+SELECT_POWER_BAND = """
+    SELECT * FROM events_by_power_band
+    WHERE station_id = ? AND hour_bucket = ? AND power_band = ? AND power_kw > ? AND power_kw < ?
+"""
+
+
+def create_power_index_table(session):
+    session.execute(CREATE_POWER_INDEX)
+
+
+def band_of(power):
+    """Номер смуги потужності (не плутати з ev_data.power_band - діапазоном потужності за годиною)"""
+    return int(power // BAND_WIDTH_KW)
+
+
+def power_index_row(reading):
+    """Показник -> параметри INSERT_POWER_INDEX"""
+    station, hour_bucket, _, event_time, conn, power = reading
+    return (station, hour_bucket, band_of(power), power, event_time, conn)
+
+
+def bands_for(low=None, high=None):
+    """Номери смуг, що перетинаються з (low, high); None - без обмеження з цього боку"""
+    first = band_of(max(low, 0.0)) if low is not None else 0
+    last = band_of(MAX_POWER_KW)
+    if high is not None and high <= MAX_POWER_KW:
+        # high не входить у діапазон: на межі смуги (high=1.0) остання смуга - та, що закінчується на high
+        last = math.ceil(high / BAND_WIDTH_KW) - 1
+    return list(range(first, last + 1))
+
+
+def query_power_range(session, stmt, station_id, hour_bucket, low=None, high=None):
+    """
+    Показники години з low < power_kw < high: читаються лише потрібні смуги (паралельно),
+    результати зливаються за power_kw. stmt - підготовлений SELECT_POWER_BAND.
+    """
+    low_bound = -math.inf if low is None else low
+    high_bound = math.inf if high is None else high
+    params = [[station_id, hour_bucket, band, low_bound, high_bound] for band in bands_for(low, high)]
+    return fanout_read(session, stmt, params, key='power_kw')
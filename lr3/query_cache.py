@@ -0,0 +1,101 @@
+import sys
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+
+# --- КОНФІГУРАЦІЯ ---
+MEMORY_BUDGET = 64 * 1024 * 1024   # Максимальний (оцінений) обсяг закешованих рядків, байт
+OPEN_BUCKET_TTL = 5.0              # Скільки секунд тримати результат відкритого bucket-а / latest
+HOURLY = 'hourly'                  # Префікси ключів кешу
+LATEST = 'latest'
+
+
+def rows_size(rows):
+    """Наближений обсяг результату в пам'яті: кортежі рядків + їх значення"""
+    size = sys.getsizeof(rows)
+    for row in rows:
+        size += sys.getsizeof(row) + sum(sys.getsizeof(value) for value in row)
+    return size
+
+
+def hour_bucket_closed(hour_bucket, now=None):
+    """Чи завершилась година bucket-а (YYYYMMDDHH): такі дані вже не змінюються"""
+    start = datetime.strptime(str(hour_bucket), '%Y%m%d%H')
+    return start + timedelta(hours=1) <= (now or datetime.now())
+
+
+class QueryCache:
+    """
+    Read-through кеш результатів запитів. Незмінні результати (закриті bucket-и)
+    живуть, доки їх не витіснить LRU; змінні (відкритий bucket, «останні N») - OPEN_BUCKET_TTL секунд.
+    Коли оцінений обсяг перевищує max_bytes, витісняються найдовше невикористані записи.
+    """
+
+    def __init__(self, max_bytes=MEMORY_BUDGET, ttl=OPEN_BUCKET_TTL, clock=time.monotonic):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.clock = clock
+        self.entries = OrderedDict()  # ключ -> (rows, розмір, час закінчення або None)
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get_or_load(self, key, loader, immutable):
+        entry = self.entries.get(key)
+        if entry is not None:
+            rows, size, expires = entry
+            if expires is None or self.clock() < expires:
+                self.hits += 1
+                self.entries.move_to_end(key)
+                return rows
+            self.expirations += 1
+            self._remove(key)
+
+        self.misses += 1
+        rows = list(loader())
+        self._store(key, rows, None if immutable else self.clock() + self.ttl)
+        return rows
+
+    def _store(self, key, rows, expires):
+        size = rows_size(rows)
+        if size > self.max_bytes:
+            return  # Більше за весь бюджет - не кешуємо
+        self.entries[key] = (rows, size, expires)
+        self.bytes += size
+        while self.bytes > self.max_bytes:
+            oldest = next(iter(self.entries))
+            self._remove(oldest)  # Витісняємо найдовше невикористаний запис
+            self.evictions += 1
+
+    def _remove(self, key):
+        _, size, _ = self.entries.pop(key)
+        self.bytes -= size
+
+    def hit_ratio(self):
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def report(self):
+        return (f"Кеш: влучань {self.hits} | промахів {self.misses} ({self.hit_ratio():.1%}) | "
+                f"витіснень {self.evictions} | прострочених {self.expirations} | "
+                f"{len(self.entries)} записів, {self.bytes / 1024 / 1024:.1f} МБ")
+
+
+def cached_hour_bucket(cache, session, stmt, station_id, hour_bucket, now=None):
+    """Рядки погодинного bucket-а: закритий кешується назавжди, поточний - на TTL"""
+    return cache.get_or_load(
+        (HOURLY, station_id, hour_bucket),
+        lambda: session.execute(stmt, [station_id, hour_bucket]),
+        immutable=hour_bucket_closed(hour_bucket, now)
+    )
+
+
+def cached_latest(cache, session, stmt, station_id):
+    """«Останні N записів» станції змінюються з кожною вставкою - кешуються лише на TTL"""
+    return cache.get_or_load(
+        (LATEST, station_id),
+        lambda: session.execute(stmt, [station_id]),
+        immutable=False
+    )
@@ -0,0 +1,149 @@
+import math
+
+# --- КОНФІГУРАЦІЯ ---
+HIGH_POWER_KW = 2.5        # Поріг "високої" потужності (як у MV events_high_power)
+LOW_POWER_KW = 1.0         # Поріг "низької" потужності (як у MV events_low_power)
+
+# Погодинні агрегати: один день станції - одна партиція (24 рядки)
+CREATE_HOURLY_ROLLUP = """
+    CREATE TABLE IF NOT EXISTS station_hourly_rollup (
+        station_id uuid,
+        day_bucket date,
+        hour_bucket int,
+        readings int,
+        power_sum double,
+        power_min double,
+        power_max double,
+        high_power_count int,
+        low_power_count int,
+        connector_counts map<text, int>,
+        PRIMARY KEY ((station_id, day_bucket), hour_bucket)
+    )
+"""
+# Денні агрегати: одна станція - одна партиція, день - рядок
+CREATE_DAILY_ROLLUP = """
+    CREATE TABLE IF NOT EXISTS station_daily_rollup (
+        station_id uuid,
+        day_bucket date,
+        readings int,
+        power_sum double,
+        power_min double,
+        power_max double,
+        high_power_count int,
+        low_power_count int,
+        connector_counts map<text, int>,
+        PRIMARY KEY ((station_id), day_bucket)
+    )
+"""
+INSERT_HOURLY_ROLLUP = """
+    INSERT INTO station_hourly_rollup
+    (station_id, day_bucket, hour_bucket, readings, power_sum, power_min, power_max,
+     high_power_count, low_power_count, connector_counts)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+INSERT_DAILY_ROLLUP = """
+    INSERT INTO station_daily_rollup
+    (station_id, day_bucket, readings, power_sum, power_min, power_max,
+     high_power_count, low_power_count, connector_counts)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+SELECT_HOURLY_ROLLUP = "SELECT * FROM station_hourly_rollup WHERE station_id = ? AND day_bucket = ?"
+SELECT_DAILY_ROLLUP = "SELECT * FROM station_daily_rollup WHERE station_id = ? AND day_bucket = ?"
+SELECT_DAILY_ROLLUP_RANGE = "SELECT * FROM station_daily_rollup WHERE station_id = ? AND day_bucket >= ? AND day_bucket <= ?"
+
+
+def create_rollup_tables(session):
+    session.execute(CREATE_HOURLY_ROLLUP)
+    session.execute(CREATE_DAILY_ROLLUP)
+
+
+class PowerRollup:
+    """Агрегат показників: кількість, сума, мін/макс power_kw, пороги та лічильники конекторів"""
+
+    __slots__ = ('readings', 'power_sum', 'power_min', 'power_max', 'high_power', 'low_power', 'connectors')
+
+    def __init__(self):
+        self.readings = 0
+        self.power_sum = 0.0
+        self.power_min = math.inf
+        self.power_max = -math.inf
+        self.high_power = 0
+        self.low_power = 0
+        self.connectors = {}
+
+    def add(self, connector, power):
+        self.readings += 1
+        self.power_sum += power
+        if power < self.power_min:
+            self.power_min = power
+        if power > self.power_max:
+            self.power_max = power
+        if power > HIGH_POWER_KW:
+            self.high_power += 1
+        if power < LOW_POWER_KW:
+            self.low_power += 1
+        self.connectors[connector] = self.connectors.get(connector, 0) + 1
+
+    def merge(self, other):
+        self.readings += other.readings
+        self.power_sum += other.power_sum
+        self.power_min = min(self.power_min, other.power_min)
+        self.power_max = max(self.power_max, other.power_max)
+        self.high_power += other.high_power
+        self.low_power += other.low_power
+        for connector, count in other.connectors.items():
+            self.connectors[connector] = self.connectors.get(connector, 0) + count
+
+    def values(self):
+        return (self.readings, round(self.power_sum, 2), self.power_min, self.power_max,
+                self.high_power, self.low_power, self.connectors)
+
+
+class IngestRollups:
+    """
+    Рахує погодинні та денні агрегати станцій під час генерації.
+    Потік показників упорядкований за днями, тому на межі дня агрегати попереднього дня
+    завершені й віддаються як пари (statement, params) для того ж конвеєра запису.
+    Вставки перезаписують агрегат цілком, тож повторний запуск генератора ідемпотентний.
+    Показники з однаковим event_time враховуються один раз (останній), як і в сирих таблицях.
+    """
+
+    def __init__(self, insert_hourly_rollup, insert_daily_rollup):
+        self.insert_hourly_rollup = insert_hourly_rollup
+        self.insert_daily_rollup = insert_daily_rollup
+        self.current_day = None
+        self.hours = {}  # (station_id, hour_bucket) -> {event_time: (connector_type, power_kw)}
+
+    def add(self, reading):
+        """Враховує показник; повертає запити для завершеного дня (зазвичай порожній кортеж)"""
+        station, hour_bucket, day_bucket, event_time, conn, power = reading
+        completed = ()
+        if day_bucket != self.current_day:
+            completed = self.flush()
+            self.current_day = day_bucket
+
+        events = self.hours.get((station, hour_bucket))
+        if events is None:
+            events = self.hours[(station, hour_bucket)] = {}
+        events[event_time] = (conn, power)
+        return completed
+
+    def flush(self):
+        """Запити для всіх накопичених годин і днів (викликати також у кінці потоку)"""
+        statements = []
+        days = {}
+        for (station, hour_bucket), events in self.hours.items():
+            rollup = PowerRollup()
+            for conn, power in events.values():
+                rollup.add(conn, power)
+            statements.append((self.insert_hourly_rollup,
+                               (station, self.current_day, hour_bucket) + rollup.values()))
+            day = days.get(station)
+            if day is None:
+                day = days[station] = PowerRollup()
+            day.merge(rollup)
+        for station, rollup in days.items():
+            statements.append((self.insert_daily_rollup, (station, self.current_day) + rollup.values()))
+        self.hours = {}
+        return statements
+
@@ -0,0 +1,174 @@
+import random
+import statistics
+from datetime import date, datetime
+from uuid import UUID
+from cassandra.cluster import Cluster
+from cassandra.concurrent import execute_concurrent
+from ev_data import KEYSPACE, READINGS_PER_HOUR
+
+# --- КОНФІГУРАЦІЯ ---
+CASSANDRA_HOSTS = ['127.0.0.1']    # Достатньо локального single-node
+TABLES = ['charging_events_simple', 'charging_events_hourly', 'charging_sessions_daily']
+TOKEN_SPLITS = 256                 # На скільки діапазонів ділимо кільце токенів
+SAMPLE_RANGES = 32                 # Скільки з них читаємо (вибірка партицій)
+ROW_SAMPLE = 200                   # Рядків для оцінки розміру рядка
+CONCURRENCY = 16
+SEED = 42
+TARGET_MIN_BYTES = 1 * 1024 * 1024      # Нижня межа бажаного розміру партиції
+TARGET_MAX_BYTES = 100 * 1024 * 1024    # Верхня межа (рекомендація Cassandra: до ~100 МБ)
+
+# Наближені накладні витрати формату SSTable (заголовки рядка та клітинки, мітки часу)
+ROW_OVERHEAD = 12
+CELL_OVERHEAD = 8
+
+MIN_TOKEN = -2 ** 63               # Діапазон токенів Murmur3Partitioner
+MAX_TOKEN = 2 ** 63 - 1
+
+# Колонка-bucket у ключі партиції -> скільки годин покриває одна партиція
+BUCKET_SPANS = {'hour_bucket': 1, 'day_bucket': 24}
+# Варіанти bucket-а для рекомендації (назва, годин)
+BUCKET_CANDIDATES = [('година', 1), ('день', 24), ('тиждень', 24 * 7), ('місяць', 24 * 30), ('рік', 24 * 365)]
+
+
+def token_ranges(splits=TOKEN_SPLITS):
+    """Ділить кільце токенів на splits непересічних діапазонів [start, end]"""
+    step = (MAX_TOKEN - MIN_TOKEN) // splits
+    bounds = [MIN_TOKEN + i * step for i in range(splits)] + [MAX_TOKEN]
+    return [(bounds[i] if i == 0 else bounds[i] + 1, bounds[i + 1]) for i in range(splits)]
+
+
+def value_size(value):
+    """Приблизний розмір серіалізованого значення (байт)"""
+    if value is None:
+        return 0
+    if isinstance(value, UUID):
+        return 16
+    if isinstance(value, bool):
+        return 1
+    if isinstance(value, (datetime, float)):
+        return 8
+    if isinstance(value, (int, date)):
+        return 4 if isinstance(value, date) or -2 ** 31 <= value < 2 ** 31 else 8
+    if isinstance(value, str):
+        return len(value.encode('utf-8'))
+    if isinstance(value, dict):
+        return sum(value_size(k) + value_size(v) + CELL_OVERHEAD for k, v in value.items())
+    return len(str(value))
+
+
+def sample_partition_counts(session, table, partition_key):
+    """Кількість рядків у кожній партиції вибраних діапазонів токенів (GROUP BY ключу партиції)"""
+    key = ', '.join(partition_key)
+    stmt = session.prepare(
+        f"SELECT {key}, COUNT(*) AS n FROM {table} "
+        f"WHERE token({key}) >= ? AND token({key}) <= ? GROUP BY {key}"
+    )
+    ranges = random.Random(SEED).sample(token_ranges(), SAMPLE_RANGES)
+    results = execute_concurrent(session, [(stmt, bounds) for bounds in ranges],
+                                 concurrency=CONCURRENCY, raise_on_first_error=True)
+    counts = [row.n for _, result in results for row in result]
+    return counts
+
+
+def estimate_row_bytes(session, table, key_columns):
+    """Середній розмір рядка на диску за вибіркою (ключ партиції зберігається раз на партицію)"""
+    rows = list(session.execute(f"SELECT * FROM {table} LIMIT {ROW_SAMPLE}"))
+    if not rows:
+        return 0
+    sizes = []
+    for row in rows:
+        cells = [(name, value) for name, value in row._asdict().items() if name not in key_columns]
+        sizes.append(ROW_OVERHEAD + sum(value_size(value) + CELL_OVERHEAD for _, value in cells))
+    return statistics.mean(sizes)
+
+
+def bucket_span_hours(partition_key):
+    """Скільки годин даних потрапляє в одну партицію (None - партиція росте без обмежень)"""
+    spans = [BUCKET_SPANS[column] for column in partition_key if column in BUCKET_SPANS]
+    return min(spans) if spans else None
+
+
+def recommend_bucket(bytes_per_hour):
+    """
+    Найменший bucket, партиції якого не менші за TARGET_MIN_BYTES і не більші за TARGET_MAX_BYTES;
+    якщо такого немає - найбільший, що вміщується в TARGET_MAX_BYTES.
+    """
+    fitting = [(name, hours) for name, hours in BUCKET_CANDIDATES if bytes_per_hour * hours <= TARGET_MAX_BYTES]
+    if not fitting:
+        return BUCKET_CANDIDATES[0]
+    for name, hours in fitting:
+        if bytes_per_hour * hours >= TARGET_MIN_BYTES:
+            return name, hours
+    return fitting[-1]
+
+
+def format_bytes(size):
+    for unit in ['Б', 'КБ', 'МБ', 'ГБ']:
+        if size < 1024:
+            return f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} ТБ"
+
+
+def analyze_table(session, metadata, table):
+    table_meta = metadata.tables[table]
+    partition_key = [column.name for column in table_meta.partition_key]
+    print(f"\n--- {table} (PRIMARY KEY (({', '.join(partition_key)}), "
+          f"{', '.join(c.name for c in table_meta.clustering_key)})) ---")
+
+    counts = sample_partition_counts(session, table, partition_key)
+    if not counts:
+        print("Немає даних у вибраних діапазонах токенів")
+        return
+
+    row_bytes = estimate_row_bytes(session, table, partition_key)
+    mean_rows = statistics.mean(counts)
+    p50 = statistics.median(counts)
+    p95 = sorted(counts)[int(len(counts) * 0.95)]
+    skew = max(counts) / mean_rows
+    estimated_partitions = len(counts) * TOKEN_SPLITS / SAMPLE_RANGES
+
+    print(f"Партицій у вибірці: {len(counts)} (~{estimated_partitions:,.0f} у таблиці)")
+    print(f"Рядків у партиції: avg {mean_rows:,.0f} | p50 {p50:,.0f} | p95 {p95:,.0f} | max {max(counts):,}")
+    print(f"Перекіс (max/avg): {skew:.2f}")
+    print(f"Розмір рядка: ~{row_bytes:.0f} Б -> партиція: avg {format_bytes(mean_rows * row_bytes)}, "
+          f"max {format_bytes(max(counts) * row_bytes)}")
+
+    # Ріст однієї станції при поточній частоті генерації
+    bytes_per_hour = READINGS_PER_HOUR * row_bytes
+    span = bucket_span_hours(partition_key)
+    if span is None:
+        print(f"Ріст партиції: +{format_bytes(bytes_per_hour * 24)}/день БЕЗ обмеження "
+              f"(рік: {format_bytes(bytes_per_hour * 24 * 365)})")
+    else:
+        print(f"Ріст партиції: +{format_bytes(bytes_per_hour * min(span, 24))}/день, "
+              f"закривається після {span} год (максимум {format_bytes(bytes_per_hour * span)})")
+
+    name, hours = recommend_bucket(bytes_per_hour)
+    verdict = "поточний bucket підходить" if span == hours else f"рекомендовано bucket: {name}"
+    print(f"Рекомендація ({format_bytes(TARGET_MIN_BYTES)}-{format_bytes(TARGET_MAX_BYTES)} на партицію): "
+          f"{verdict} (~{format_bytes(bytes_per_hour * hours)} на партицію)")
+
+
+def main():
+    cluster = Cluster(CASSANDRA_HOSTS)
+    session = cluster.connect(KEYSPACE)
+    metadata = cluster.metadata.keyspaces[KEYSPACE]
+
+    print(f"Аналіз схем {KEYSPACE}: {SAMPLE_RANGES}/{TOKEN_SPLITS} діапазонів токенів, "
+          f"{READINGS_PER_HOUR} показників/год на станцію")
+    print("=" * 100)
+    for table in TABLES:
+        if table not in metadata.tables:
+            print(f"\n--- {table}: таблиці немає, пропускаємо ---")
+            continue
+        try:
+            analyze_table(session, metadata, table)
+        except Exception as e:
+            print(f"Помилка аналізу {table}: {e}")
+
+    cluster.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,24 @@
 import os
+import time
+import asyncio
 import faust
-from datetime import datetime
+from datetime import datetime, timedelta
 from cassandra.cluster import Cluster
 from cassandra.query import SimpleStatement
 
 KAFKA_BROKER = 'kafka://localhost:9092'
 KEYSPACE = 'lab4_energy'
 WINDOW_SIZE = 300
+BATCH_SIZE = 500       # Максимум подій в одному пакеті агента
+BATCH_WITHIN = 1.0     # Скільки секунд чекати на повний пакет, перш ніж обробити неповний
+MAX_IN_FLIGHT = 256    # Максимум одночасних запитів до Cassandra (backpressure)
+RETRY_BACKOFF = 0.5    # Пауза (с) перед повтором невдалого запису пакета, подвоюється з кожною спробою
+MAX_RETRY_BACKOFF = 30.0
+WINDOW_GRACE = 60      # Запас для запізнілих подій: expires = WINDOW_SIZE + WINDOW_GRACE (див. window_closed)
+SNAPSHOT_INTERVAL = 30 # Проміжні стани відкритого вікна - не частіше ніж раз на N секунд (None - лише фінальні)
+FLUSH_INTERVAL = 1.0   # Як часто (с) шукати вікна, які Faust сам не закрив
+IDLE_CLOSE_AFTER = WINDOW_SIZE + WINDOW_GRACE  # Тиха партиція: стільки секунд без подій - і вікна закриваються за годинником
+FINAL_RETRIES = 3      # Спроб синхронного фінального запису при закритті вікна
 
 print("Підключення до Cassandra...")
 cluster = Cluster(['127.0.0.1'])
@@ -18,13 +30,63 @@ insert_log_stmt = session.prepare("""
     VALUES (?, ?, ?, ?, ?, ?, ?)
 """)
 
+# Час запису рядка агрегату - не годинник, а кількість подій у вікні (див. window_params):
+# пізніший стан вікна завжди перемагає ранніший, незалежно від порядку, в якому дійшли запити
 insert_agg_stmt = session.prepare("""
     INSERT INTO station_utilization_state
     (station_id, window_start, window_end, total_energy_kwh, total_revenue, active_sessions_count)
     VALUES (?, ?, ?, ?, ?, ?)
+    USING TIMESTAMP ?
 """)
 print("Cassandra підключена.")
 
+class AsyncCassandraWriter:
+    """
+    Неблокуючий запис з asyncio: ResponseFuture драйвера (execute_async) перекладається
+    в asyncio.Future через call_soon_threadsafe, а семафор обмежує кількість запитів у польоті,
+    тож агент чекає на базу лише тоді, коли вона не встигає.
+    """
+
+    def __init__(self, session, max_in_flight=MAX_IN_FLIGHT):
+        self.session = session
+        self.max_in_flight = max_in_flight
+        self._semaphore = None  # Створюється всередині циклу подій агента
+
+    async def execute(self, stmt, params):
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_in_flight)
+        await self._semaphore.acquire()
+
+        loop = asyncio.get_running_loop()
+        result = loop.create_future()
+
+        def on_success(rows):
+            loop.call_soon_threadsafe(_resolve, result, rows, None)
+
+        def on_error(exc):
+            loop.call_soon_threadsafe(_resolve, result, None, exc)
+
+        try:
+            self.session.execute_async(stmt, params).add_callbacks(on_success, on_error)
+            return await result
+        finally:
+            self._semaphore.release()
+
+    async def execute_many(self, statements_and_params):
+        """Усі запити пакета паралельно (в межах max_in_flight); помилка будь-якого - виняток"""
+        await asyncio.gather(*(self.execute(stmt, params) for stmt, params in statements_and_params))
+
+def _resolve(future, rows, exc):
+    """Завершує asyncio.Future у потоці циклу подій (колбеки драйвера йдуть з його потоку)"""
+    if future.done():
+        return
+    if exc is not None:
+        future.set_exception(exc)
+    else:
+        future.set_result(rows)
+
+writer = AsyncCassandraWriter(session)
+
 class ChargingEvent(faust.Record):
     session_id: str
     station_id: str
@@ -49,52 +111,175 @@ app = faust.App(
 
 topic = app.topic('charging_events', value_type=ChargingEvent)
 
+late_events = 0         # Події, що прийшли після закриття свого вікна
+# Час партицій - те саме, за чим вікна закриває Faust (_partition_latest_timestamp)
+latest_ends = {}        # Партиція -> найпізніший кінець вікна, в яке потрапила подія
+partition_seen = {}     # Партиція -> time.monotonic() останньої події
+station_partitions = {} # station_id -> партиція (після group_by станція живе в одній партиції)
+
+def window_params(station_id, window_start_ts, stats, final=False):
+    """
+    Параметри insert_agg_stmt. Час запису = 2 * кількість подій (+1 для фінального): проміжний стан
+    не перезапише фінальний, а повторний запис того самого стану (повтор, відновлення) нічого не змінює.
+    """
+    w_start = datetime.fromtimestamp(window_start_ts)
+    return [
+        custom_uuid(station_id),
+        w_start,
+        w_start + timedelta(seconds=WINDOW_SIZE),
+        round(stats.total_kwh, 4),
+        round(stats.total_revenue, 2),
+        stats.count,
+        stats.count * 2 + (1 if final else 0)
+    ]
+
+def window_closed(station_id, window_range):
+    """
+    Чи закрите вікно - за тим самим правилом, що й у Faust: вікно застаріле, коли його кінець
+    не пізніше за початок вікна, що містить (найпізніший кінець вікна партиції - expires).
+    Для WINDOW_GRACE < WINDOW_SIZE це значить, що в партиції вже є події на два вікна пізніше,
+    а не «кінець + grace»; саме видалення Faust робить ще й лише на таймері table_cleanup_interval.
+    Тиха партиція свій час не рухає, тож для неї (і для станцій, яких ще не бачили після старту)
+    вікно закривається за годинником: кінець вікна + IDLE_CLOSE_AFTER у минулому.
+    """
+    partition = station_partitions.get(station_id)
+    if partition is None or time.monotonic() - partition_seen[partition] >= IDLE_CLOSE_AFTER:
+        return window_range[1] + IDLE_CLOSE_AFTER < time.time()
+    return stats_table.table.window.stale(window_range[1], latest_ends[partition])
+
+def on_window_close(key, stats):
+    """
+    Faust викликає вже після видалення вікна з таблиці, тож фінальний агрегат пишемо тут же,
+    синхронно і з повторами. Якщо Cassandra так і не відповіла, вікно повертається у сховище
+    таблиці й буде дописане close_stale_windows.
+    """
+    if stats is None:
+        return  # Вікно вже закрите й записане close_stale_windows
+    station_id, (window_start_ts, _) = key
+    params = window_params(station_id, window_start_ts, stats, final=True)
+    for attempt in range(FINAL_RETRIES):
+        try:
+            session.execute(insert_agg_stmt, params)
+            return
+        except Exception as e:
+            print(f"Помилка фінального запису вікна ({e}), спроба {attempt + 1}/{FINAL_RETRIES}")
+            time.sleep(RETRY_BACKOFF * 2 ** attempt)
+    stats_table.table.data[key] = stats
+
+# Faust 1.10 закриває вікна лише в партиціях, де йдуть події, і тримає один last_closed_window
+# на всю таблицю: при кількох партиціях колбеки частини вікон пропускаються. Такі вікна,
+# а також відновлені з changelog після рестарту (для них Faust TTL не реєструє), закриває close_stale_windows
 stats_table = app.Table(
     'station_stats',
     default=StationStats,
-).tumbling(WINDOW_SIZE).relative_to_field(ChargingEvent.timestamp)
+    on_window_close=on_window_close,
+).tumbling(
+    WINDOW_SIZE, expires=timedelta(seconds=WINDOW_SIZE + WINDOW_GRACE)
+).relative_to_field(ChargingEvent.timestamp)
+
+async def write_with_retry(statements):
+    """
+    Пише пакет, доки запис не вдасться: події підтверджуються лише після нього,
+    тож пакет не можна ні пропустити, ні втратити. Вставки ідемпотентні - повтор безпечний.
+    """
+    backoff = RETRY_BACKOFF
+    while True:
+        try:
+            await writer.execute_many(statements)
+            return
+        except Exception as e:
+            print(f"Помилка запису в Cassandra ({e}), повтор через {backoff:.1f} с")
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 2, MAX_RETRY_BACKOFF)
 
 @app.agent(topic)
 async def process_charging(events):
-    async for event in events.group_by(ChargingEvent.station_id):
-        
-        dt_object = datetime.fromisoformat(event.event_time)
-        
-        session.execute(insert_log_stmt, [
+    # Вікна оновлюються процесором потоку: Faust викликає його для кожної події з її власним
+    # current_event, тож .value() і set-item беруть вікно й партицію саме цієї події.
+    # take() лише збирає пакет для Cassandra і підтверджує події після виходу з тіла циклу,
+    # тобто офсети просуваються тільки тоді, коли записи пакета вже в базі.
+    last_snapshot = {}  # (station_id, window_start) -> час останнього проміжного запису
+
+    def update_window(event):
+        """Процесор: оновлює вікно події й повертає (подія, проміжний стан вікна або None)"""
+        global late_events
+        current = faust.current_event()
+
+        # Вікно вже закрите й записане - оновлення створило б новий неповний агрегат
+        window_range = stats_table.table.window.current(event.timestamp)
+        window_start_ts = window_range[0]
+        if window_closed(event.station_id, window_range):
+            late_events += 1
+            return event, None
+
+        partition = current.message.partition
+        station_partitions[event.station_id] = partition
+        partition_seen[partition] = time.monotonic()
+        latest_ends[partition] = max(latest_ends.get(partition, 0.0), window_range[1])
+
+        # .value() бере вікно за relative_to_field (як і set-item), а .current() - за часом повідомлення Kafka
+        current_stats = stats_table[event.station_id].value(current)
+
+        current_stats.total_kwh += event.amount_kwh
+        current_stats.total_revenue += event.amount_money
+        current_stats.count += 1
+
+        stats_table[event.station_id] = current_stats
+
+        now = time.monotonic()
+        window_key = (event.station_id, window_start_ts)
+        if SNAPSHOT_INTERVAL is not None and now - last_snapshot.get(window_key, 0.0) >= SNAPSHOT_INTERVAL:
+            last_snapshot[window_key] = now
+            return event, window_params(event.station_id, window_start_ts, current_stats)
+        return event, None
+
+    stream = events.group_by(ChargingEvent.station_id)
+    stream.add_processor(update_window)
+
+    async for batch in stream.take(BATCH_SIZE, within=BATCH_WITHIN):
+        statements = [(insert_log_stmt, [
             custom_uuid(event.session_id),
-            dt_object,
+            datetime.fromisoformat(event.event_time),
             event.event_type,
             custom_uuid(event.station_id),
             event.amount_kwh,
             event.amount_money,
             event.details
-        ])
+        ]) for event, _ in batch]
+        # Останній проміжний стан кожного вікна в пакеті
+        snapshots = {(params[0], params[1]): params for _, params in batch if params is not None}
+        statements += [(insert_agg_stmt, params) for params in snapshots.values()]
 
-        current_stats = stats_table[event.station_id].current()
-        
-        current_stats.total_kwh += event.amount_kwh
-        current_stats.total_revenue += event.amount_money
-        current_stats.count += 1
-        
-        stats_table[event.station_id] = current_stats
+        await write_with_retry(statements)
 
-        timestamp = dt_object.timestamp()
-        window_start_ts = timestamp - (timestamp % WINDOW_SIZE)
-        window_end_ts = window_start_ts + WINDOW_SIZE
-        
-        w_start = datetime.fromtimestamp(window_start_ts)
-        w_end = datetime.fromtimestamp(window_end_ts)
+        # Ключі закритих вікон більше не знадобляться
+        for window_key in [k for k in last_snapshot if window_closed(k[0], (k[1], k[1] + WINDOW_SIZE))]:
+            del last_snapshot[window_key]
 
-        session.execute(insert_agg_stmt, [
-            custom_uuid(event.station_id),
-            w_start,
-            w_end,
-            round(current_stats.total_kwh, 4),
-            round(current_stats.total_revenue, 2),
-            current_stats.count
+        print(f"Processed: {len(batch)} events | Writes: {len(statements)} | Late: {late_events}")
+
+@app.timer(interval=FLUSH_INTERVAL)
+async def close_stale_windows():
+    """
+    Фінальний запис вікон, які вже закриті за window_closed, але досі лежать у таблиці:
+    тихі партиції, пропущені колбеки, відновлені з changelog після рестарту, невдалий запис
+    в on_window_close. Вікно видаляється зі сховища лише після успішного запису, тож падіння
+    процесу нічого не втрачає: changelog відновить вікно, і його буде записано повторно (ідемпотентно).
+    """
+    store = stats_table.table.data
+    closed = [(key, stats, stats.count) for key, stats in list(store.items()) if window_closed(key[0], key[1])]
+    for i in range(0, len(closed), BATCH_SIZE):
+        chunk = closed[i:i + BATCH_SIZE]
+        await write_with_retry([
+            (insert_agg_stmt, window_params(station_id, window_start_ts, stats, final=True))
+            for (station_id, (window_start_ts, _)), stats, _ in chunk
         ])
-        
-        print(f"Processed: {event.event_type} | Station: {event.station_id[:8]} | Window: {w_start.time()}")
+        for key, _, count in chunk:
+            stats = store.get(key)
+            if stats is not None and stats.count == count:  # Не змінилось під час запису
+                store.pop(key, None)
+    if closed:
+        print(f"Closed windows written: {len(closed)}")
 
 def custom_uuid(s):
     from uuid import UUID